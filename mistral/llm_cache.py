@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+import zlib
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 30 * 24 * 3600
+
+
+def normalize_text(text):
+    """Fold the differences that do not change what the model is asked: Unicode forms and whitespace."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+def response_cache_key(model, options, text):
+    """Cache key for one prompt: the model, its generation options and the normalized prompt text."""
+    h = hashlib.sha256()
+    h.update(f"{model}\0{json.dumps(options or {}, sort_keys=True)}\0{normalize_text(text)}".encode())
+    return h.hexdigest()
+
+
+class LLMCache:
+    """Persistent cache of model responses, bounded by size and age.
+
+    Entries live in one SQLite file (WAL mode), so several processes can share
+    a cache. Responses are stored zlib-compressed. Entries older than `ttl`
+    seconds are treated as misses and dropped. When the stored size goes over
+    max_bytes, expired entries are removed first and then the least recently
+    used ones, down to 90% of the limit.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses ("
+                        "key TEXT PRIMARY KEY, model TEXT NOT NULL, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                        "created REAL NOT NULL, last_used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+        self._total = self._stored_bytes()
+
+    def _stored_bytes(self):
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """Return the cached response text for `key`, or None on a miss or an expired entry."""
+        row = self.db.execute("SELECT value, created, size FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is not None and self.ttl is not None and row[1] < now - self.ttl:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total -= row[2]
+            self.expired += 1
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return zlib.decompress(row[0]).decode()
+
+    def put(self, key, model, response):
+        blob = zlib.compress(response.encode(), 6)
+        now = time.time()
+        self.db.execute("INSERT OR REPLACE INTO responses (key, model, value, size, created, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", (key, model, blob, len(blob), now, now))
+        self._total += len(blob)
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until the cache is at 90% of max_bytes."""
+        if self.ttl is not None:
+            self.db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        self._total = self._stored_bytes()
+        target = int(self.max_bytes * 0.9)
+        while self._total > target:
+            rows = self.db.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT 256").fetchall()
+            if not rows:
+                break
+            dropped = []
+            for key, size in rows:
+                if self._total <= target:
+                    break
+                dropped.append((key,))
+                self._total -= size
+            self.db.executemany("DELETE FROM responses WHERE key = ?", dropped)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else None, "bytes": self._total}
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import httpx
+from ollama import AsyncClient, ResponseError
+from llm_cache import LLMCache, response_cache_key
+
+# Used when neither a host nor OLLAMA_HOST is given; OLLAMA_HOST is read when a SlideLLM is created
+DEFAULT_HOST = "http://localhost:11434"
+DEFAULT_MODEL = "mistral"
+
+# Statuses worth retrying: timeouts, rate limiting and a busy or restarting server
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+PROMPTS = {
+    "summarize": "Summarize this presentation slide in one or two sentences.",
+    "classify": ("Classify this presentation slide as one of: title, agenda, content, chart, table, "
+                 "image, closing, disclaimer. Answer with the label only."),
+}
+
+
+def slide_text(record):
+    """Plain text of a slide record from xml_to_json (text shapes first, then table cells), one line per block."""
+    lines = []
+    for element in record.get("elements", []):
+        if element["type"] == "text":
+            text = "".join(run["text"] for run in element["content"]).strip()
+            if text:
+                lines.append(text)
+        elif element["type"] == "table":
+            for row in element["rows"]:
+                cells = [cell["content"].strip() for cell in row]
+                if any(cells):
+                    lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+def slide_prompt(record, instruction=PROMPTS["summarize"]):
+    """The prompt for one slide. It depends only on the instruction and the slide's text (not its
+    position), so the same slide in another place or deck is the same prompt and one cache entry."""
+    return f"{instruction}\n\nSlide:\n{slide_text(record) or '(no text)'}"
+
+def is_retryable(error):
+    if isinstance(error, ResponseError):
+        return error.status_code in RETRYABLE_STATUS
+    return isinstance(error, (ConnectionError, httpx.TransportError, asyncio.TimeoutError))
+
+def distribution(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {"mean": statistics.mean(ordered), "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], "max": ordered[-1]}
+
+
+class SlideLLM:
+    """Async Ollama client for running one prompt per slide concurrently.
+
+    Requests share one pooled HTTP connection set (at most `concurrency`
+    connections, kept alive between requests) and at most `concurrency` are
+    in flight at once. Responses are streamed; pass on_token to see tokens as
+    they arrive. Transient failures (connection errors, timeouts, 429/5xx)
+    are retried with exponential backoff and jitter, but only until the first
+    token has been delivered, so a consumer never sees a token twice.
+    Every request's latency, time to first token, attempts and token counts
+    are kept in `metrics`; summary() aggregates them.
+
+    With an LLMCache, responses already cached for the same model, options
+    and normalized prompt are served without a network call.
+    """
+
+    def __init__(self, host=None, model=DEFAULT_MODEL, concurrency=4, options=None, retries=3,
+                 backoff=0.5, timeout=120.0, client=None, cache=None):
+        self.model = model
+        self.cache = cache
+        self.options = options
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        host = host or os.environ.get("OLLAMA_HOST", DEFAULT_HOST)
+        self.client = client or AsyncClient(host=host, timeout=timeout, limits=limits)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.metrics = []
+
+    async def generate(self, prompt, on_token=None, tag=None, metrics=None):
+        """Run one prompt and return (response text, metrics dict); raises after the last failed attempt.
+
+        Pass a dict as `metrics` to have it filled in even when the request
+        fails. Responses are cached under the exact prompt sent; a cached
+        response reaches on_token as a single token.
+        """
+        metrics = metrics if metrics is not None else {}
+        metrics.update({"tag": tag, "cached": False, "attempts": 0, "latency": None, "first_token": None,
+                        "prompt_tokens": None, "tokens": None, "error": None})
+        cache_key = None
+        if self.cache is not None:
+            cache_key = response_cache_key(self.model, self.options, prompt)
+            response = self.cache.get(cache_key)
+            if response is not None:
+                metrics.update({"cached": True, "latency": 0.0, "first_token": 0.0})
+                self.metrics.append(metrics)
+                if on_token is not None and response:
+                    on_token(tag, response)
+                return response, metrics
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                while True:
+                    metrics["attempts"] += 1
+                    parts = []
+                    try:
+                        stream = await self.client.generate(model=self.model, prompt=prompt, stream=True,
+                                                            options=self.options)
+                        async for chunk in stream:
+                            token = chunk["response"]
+                            if token:
+                                if metrics["first_token"] is None:
+                                    metrics["first_token"] = time.perf_counter() - start
+                                parts.append(token)
+                                if on_token is not None:
+                                    on_token(tag, token)
+                            if chunk["done"]:
+                                metrics["prompt_tokens"] = chunk["prompt_eval_count"]
+                                metrics["tokens"] = chunk["eval_count"]
+                        response = "".join(parts)
+                        if cache_key is not None and response:
+                            self.cache.put(cache_key, self.model, response)
+                        return response, metrics
+                    except Exception as e:
+                        if parts or metrics["attempts"] > self.retries or not is_retryable(e):
+                            metrics["error"] = f"{type(e).__name__}: {e}"
+                            raise
+                        delay = self.backoff * 2 ** (metrics["attempts"] - 1)
+                        await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            finally:
+                metrics["latency"] = time.perf_counter() - start
+                self.metrics.append(metrics)
+
+    async def run_slides(self, records, instruction=PROMPTS["summarize"], on_token=None, window=None):
+        """Prompt the model once per slide record and yield {"index", "response", "error", "metrics"} in slide order.
+
+        `records` is what xml_to_json.iter_records yields (a header record is
+        skipped), either a plain iterable or an async one. Slides are
+        submitted in a sliding window of `window` requests (twice the
+        concurrency by default), so a long deck never queues thousands of
+        tasks and parsing of later slides overlaps with generation. A failed
+        slide is reported with its error rather than stopping the run.
+        """
+        window = window or self.concurrency * 2
+        pending = {}
+
+        async def run(record):
+            metrics = {}
+            if record.get("error"):
+                # The slide could not be parsed, so there is nothing to prompt with
+                return {"index": record["index"], "response": None, "error": record["error"], "metrics": metrics}
+            try:
+                text, _ = await self.generate(slide_prompt(record, instruction), on_token, record["index"], metrics)
+                return {"index": record["index"], "response": text, "error": None, "metrics": metrics}
+            except Exception as e:
+                return {"index": record["index"], "response": None, "error": f"{type(e).__name__}: {e}",
+                        "metrics": metrics}
+
+        async def drain(until_size):
+            while len(pending) > until_size:
+                task = pending.pop(min(pending))
+                yield await task
+
+        async for record in _aiter_records(records):
+            if record.get("record", "slide") != "slide":
+                continue
+            pending[record["index"]] = asyncio.ensure_future(run(record))
+            async for result in drain(window - 1):
+                yield result
+        async for result in drain(0):
+            yield result
+
+    def summary(self):
+        """Aggregate metrics of the requests sent to the server (cache hits are only counted)."""
+        sent = [m for m in self.metrics if not m["cached"]]
+        done = [m for m in sent if m["error"] is None]
+        return {
+            "requests": len(sent),
+            "cached": len(self.metrics) - len(sent),
+            "failed": len(sent) - len(done),
+            "retries": sum(m["attempts"] - 1 for m in sent),
+            "latency": distribution([m["latency"] for m in done]),
+            "first_token": distribution([m["first_token"] for m in done if m["first_token"] is not None]),
+            "prompt_tokens": sum(m["prompt_tokens"] or 0 for m in done),
+            "tokens": sum(m["tokens"] or 0 for m in done),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def close(self):
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def _aiter_records(records):
+    """Iterate records from an async iterable, or from a plain one in a worker thread
+    so parsing the next slide does not block requests already in flight."""
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            yield record
+        return
+    iterator = iter(records)
+    done = object()
+    while True:
+        record = await asyncio.to_thread(next, iterator, done)
+        if record is done:
+            return
+        yield record
+
+async def run_deck(pptx_file, instruction, host=None, model=DEFAULT_MODEL, concurrency=4, stream=False,
+                   output=sys.stdout, cache=None):
+    """Convert a deck and prompt the model once per slide, writing one JSON line per slide to `output`."""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "parser"))
+    from media_store import MediaStore
+    from xml_to_json import iter_records
+
+    on_token = (lambda index, token: print(token, end="", flush=True, file=sys.stderr)) if stream else None
+    async with SlideLLM(host=host, model=model, concurrency=concurrency, cache=cache) as llm:
+        records = iter_records(pptx_file, media_store=MediaStore(None))
+        async for result in llm.run_slides(records, instruction, on_token=on_token):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+        return llm.summary()
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Summarize or classify every slide of a deck with Ollama.")
+    arg_parser.add_argument("pptx_file")
+    arg_parser.add_argument("--prompt", choices=sorted(PROMPTS), default="summarize")
+    arg_parser.add_argument("--model", default=DEFAULT_MODEL)
+    arg_parser.add_argument("--host", help=f"Ollama server (default: $OLLAMA_HOST or {DEFAULT_HOST})")
+    arg_parser.add_argument("-j", "--concurrency", type=int, default=4, help="requests in flight at once")
+    arg_parser.add_argument("--stream", action="store_true", help="echo tokens to stderr as they arrive")
+    arg_parser.add_argument("--cache", metavar="PATH", default=None,
+                            help="response cache file shared across runs, so repeated slides skip the model")
+    arg_parser.add_argument("--cache-ttl", type=float, default=None, metavar="DAYS",
+                            help="drop cached responses older than this (default: 30 days)")
+    args = arg_parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        cache = LLMCache(args.cache) if args.cache_ttl is None else LLMCache(args.cache, ttl=args.cache_ttl * 86400)
+    try:
+        summary = asyncio.run(run_deck(args.pptx_file, PROMPTS[args.prompt], host=args.host, model=args.model,
+                                       concurrency=args.concurrency, stream=args.stream, cache=cache))
+    finally:
+        if cache is not None:
+            cache.close()
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
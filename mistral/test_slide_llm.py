@@ -0,0 +1,162 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from slide_llm import SlideLLM
+
+
+class FakeOllama(ThreadingHTTPServer):
+    """An Ollama /api/generate stand-in that streams one token per word of the prompt's last line.
+
+    The first `fail_first` requests get a 503; `in_flight` and
+    `max_in_flight` count the streaming requests open at once.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fail_first=0, token_delay=0.01):
+        super().__init__(("127.0.0.1", 0), FakeOllamaHandler)
+        self.fail_first = fail_first
+        self.token_delay = token_delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            failing = server.requests <= server.fail_first
+            if not failing:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        if failing:
+            error = b'{"error": "server busy"}'
+            self.send_response(503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(error)))
+            self.end_headers()
+            self.wfile.write(error)
+            return
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            words = body["prompt"].splitlines()[-1].split()
+            for word in words:
+                time.sleep(server.token_delay)
+                self.send_chunk({"model": body["model"], "response": word + " ", "done": False})
+            self.send_chunk({"model": body["model"], "response": "", "done": True,
+                             "prompt_eval_count": len(body["prompt"].split()), "eval_count": len(words)})
+            self.wfile.write(b"0\r\n\r\n")
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_chunk(self, data):
+        line = (json.dumps(data) + "\n").encode()
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+
+@pytest.fixture
+def fake_ollama(request):
+    server = FakeOllama(**getattr(request, "param", {}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def slide(index, text):
+    return {"index": index, "elements": [{"type": "text", "content": [{"text": text}]}]}
+
+async def collect(llm, records, **options):
+    return [result async for result in llm.run_slides(records, **options)]
+
+
+def test_streams_tokens(fake_ollama):
+    tokens = []
+
+    async def run():
+        async with SlideLLM(host=fake_ollama.url, retries=0) as llm:
+            return await llm.generate("Summarize\n\nalpha beta gamma", lambda tag, token: tokens.append((tag, token)),
+                                      tag=7)
+
+    response, metrics = asyncio.run(run())
+    assert response == "alpha beta gamma "
+    assert tokens == [(7, "alpha "), (7, "beta "), (7, "gamma ")]
+    assert metrics["attempts"] == 1
+    assert metrics["tokens"] == 3
+    assert metrics["first_token"] is not None and metrics["first_token"] <= metrics["latency"]
+
+
+@pytest.mark.parametrize("fake_ollama", [{"fail_first": 1}], indirect=True)
+def test_retries_503_before_first_token(fake_ollama):
+    async def run():
+        async with SlideLLM(host=fake_ollama.url, retries=2, backoff=0.01) as llm:
+            response, metrics = await llm.generate("Summarize\n\nalpha beta")
+            return response, metrics, llm.summary()
+
+    response, metrics, summary = asyncio.run(run())
+    assert response == "alpha beta "
+    assert metrics["attempts"] == 2
+    assert metrics["error"] is None
+    assert summary["retries"] == 1
+    assert fake_ollama.requests == 2
+
+
+@pytest.mark.parametrize("fake_ollama", [{"fail_first": 10}], indirect=True)
+def test_gives_up_after_retries(fake_ollama):
+    async def run():
+        async with SlideLLM(host=fake_ollama.url, retries=2, backoff=0.01) as llm:
+            return await collect(llm, [slide(0, "alpha")])
+
+    [result] = asyncio.run(run())
+    assert result["response"] is None
+    assert "503" in result["error"]
+    assert result["metrics"]["attempts"] == 3
+    assert fake_ollama.requests == 3
+
+
+def test_concurrency_cap(fake_ollama):
+    records = [slide(index, f"slide {index} " + "word " * 5) for index in range(12)]
+
+    async def run():
+        async with SlideLLM(host=fake_ollama.url, concurrency=3, retries=0) as llm:
+            return await collect(llm, records)
+
+    results = asyncio.run(run())
+    assert [result["index"] for result in results] == list(range(12))
+    assert all(result["error"] is None for result in results)
+    assert fake_ollama.max_in_flight == 3
+
+
+def test_host_read_at_construction(fake_ollama, monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", fake_ollama.url)
+
+    async def run():
+        async with SlideLLM(retries=0) as llm:
+            return await llm.generate("Summarize\n\nfrom the environment")
+
+    response, _ = asyncio.run(run())
+    assert response == "from the environment "
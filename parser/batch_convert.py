@@ -0,0 +1,278 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from instrumentation import Recorder, recording
+from media_store import MediaStore
+from parse_cache import ParseCache
+from text_index import TextIndex, index_outputs
+from xml_to_json import convert, iter_records, write_ndjson
+
+
+def collect_decks(source):
+    """Return (pptx_path, relative_name) pairs from a directory tree or a manifest file.
+
+    A manifest is a text file with one deck path per line; blank lines and
+    lines starting with '#' are ignored and relative paths are resolved
+    against the manifest's directory. Manifest decks are named by their path
+    relative to the deepest directory containing all of them, so decks with
+    the same file name in different directories get different outputs.
+    """
+    decks = []
+    if os.path.isdir(source):
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for name in sorted(filenames):
+                # Skip PowerPoint lock files (~$deck.pptx)
+                if name.lower().endswith(".pptx") and not name.startswith("~$"):
+                    path = os.path.join(dirpath, name)
+                    decks.append((path, os.path.relpath(path, source)))
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+        paths = []
+        with open(source) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                path = os.path.normpath(line if os.path.isabs(line) else os.path.join(base_dir, line))
+                if path not in paths:
+                    paths.append(path)
+        if paths:
+            root = os.path.commonpath([os.path.dirname(path) for path in paths])
+            decks = [(path, os.path.relpath(path, root)) for path in paths]
+    return decks
+
+def output_path_for(relative_name, output_dir, ndjson=False):
+    return os.path.join(output_dir, os.path.splitext(relative_name)[0] + (".ndjson" if ndjson else ".json"))
+
+def is_up_to_date(pptx_path, output_file):
+    """True if output_file exists and is newer than the deck it was converted from."""
+    try:
+        return os.path.getmtime(output_file) >= os.path.getmtime(pptx_path)
+    except OSError:
+        return False
+
+# Per-process parse cache, opened on first use by convert_one
+_worker_cache = None
+
+def _parse_cache(cache_path):
+    global _worker_cache
+    if cache_path is None:
+        return None
+    if _worker_cache is None or _worker_cache.path != cache_path:
+        _worker_cache = ParseCache(cache_path)
+    return _worker_cache
+
+@contextlib.contextmanager
+def capture_logs(stream):
+    """Send log output to `stream` instead of the configured handlers while the block runs."""
+    root = logging.getLogger()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    saved = root.handlers[:]
+    root.handlers = [handler]
+    try:
+        yield
+    finally:
+        root.handlers = saved
+
+class ErrorCollector(logging.Handler):
+    """Keeps the messages of ERROR records logged while it is attached."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+    def detail(self):
+        """The first error logged, i.e. the cause rather than the generic "aborting" that follows it."""
+        return self.messages[0] if self.messages else "conversion failed"
+
+@contextlib.contextmanager
+def collect_errors():
+    """Yield an ErrorCollector attached to the root logger while the block runs."""
+    root = logging.getLogger()
+    collector = ErrorCollector()
+    root.addHandler(collector)
+    try:
+        yield collector
+    finally:
+        root.removeHandler(collector)
+
+def convert_one(job):
+    """Pool worker: convert one deck and write its JSON, never raising.
+
+    Returns (pptx_path, status, detail, seconds, metrics), where metrics is the
+    deck's list of instrumentation records if they were asked for, else None.
+    """
+    pptx_path, output_file, media_dir, cache_path, ndjson, verbose, metrics = job
+    recorder = Recorder(deck=pptx_path) if metrics else None
+    with recording(recorder) if recorder else contextlib.nullcontext():
+        result = _convert_one(pptx_path, output_file, media_dir, cache_path, ndjson, verbose)
+    return (*result, list(recorder.records()) if recorder else None)
+
+def _convert_one(pptx_path, output_file, media_dir, cache_path, ndjson, verbose):
+    start = time.perf_counter()
+    log = io.StringIO()
+    # Write to a temp file first so a crash never leaves a truncated JSON that looks up to date
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        options = {"media_store": MediaStore(media_dir), "cache": _parse_cache(cache_path)}
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with contextlib.nullcontext() if verbose else capture_logs(log), collect_errors() as errors:
+            if ndjson:
+                with open(tmp_file, 'w') as f:
+                    converted = write_ndjson(iter_records(pptx_path, **options), f) > 0
+            else:
+                output_data = convert(pptx_path, **options)
+                converted = output_data is not None
+                if converted:
+                    with open(tmp_file, 'w') as f:
+                        json.dump(output_data, f, indent=2)
+        if not converted:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            return pptx_path, "failed", errors.detail(), time.perf_counter() - start
+        os.replace(tmp_file, output_file)
+        return pptx_path, "converted", output_file, time.perf_counter() - start
+    except Exception as e:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        detail = traceback.format_exc() if verbose else f"{type(e).__name__}: {e}"
+        return pptx_path, "failed", detail, time.perf_counter() - start
+
+def convert_batch(source, output_dir, workers=None, force=False, verbose=False, copy_media=True,
+                  cache_path=None, ndjson=False, metrics=False):
+    """Convert every deck under `source` over a process pool and return per-deck results.
+
+    Each result is a (pptx_path, status, detail, seconds, metrics) tuple where
+    status is "converted", "skipped" or "failed". A failing deck never stops the batch;
+    if a worker process dies (OOM kill, crash in native code) the decks that
+    were still in the pool are reported as failed and the rest of the batch
+    carries on in a fresh pool.
+    With metrics=True each converted or failed deck's instrumentation records
+    (stage timings and counters) are returned in its result.
+    All decks share one content-addressed media store in {output_dir}/media;
+    with copy_media=False media is only referenced by archive member and hash.
+    cache_path points the workers at a shared ParseCache, and ndjson=True
+    writes one {deck}.ndjson record stream per deck instead of JSON.
+    """
+    media_dir = os.path.join(output_dir, "media") if copy_media else None
+    results = []
+    jobs = []
+    for pptx_path, relative_name in collect_decks(source):
+        output_file = output_path_for(relative_name, output_dir, ndjson)
+        if not force and is_up_to_date(pptx_path, output_file):
+            results.append((pptx_path, "skipped", output_file, 0.0, None))
+        else:
+            jobs.append((pptx_path, output_file, media_dir, cache_path, ndjson, verbose, metrics))
+
+    workers = workers or os.cpu_count() or 1
+    if jobs:
+        if workers == 1:
+            results.extend(convert_one(job) for job in jobs)
+        else:
+            for result in _convert_pooled(jobs, min(workers, len(jobs))):
+                if result[1] == "failed" or verbose:
+                    print(f"{result[1]}: {result[0]} ({result[3]:.2f}s)")
+                results.append(result)
+    return results
+
+def _convert_pooled(jobs, workers):
+    """Yield convert_one results as decks finish, surviving workers that die mid-deck.
+
+    A dead worker breaks the whole pool, taking every deck still in it down
+    too. Those decks are retried one at a time in a single-worker pool
+    afterwards, so only the deck that actually kills its worker is reported
+    as failed. At most two jobs per worker are in the pool at once to keep
+    the retries few.
+    """
+    pending = list(jobs)
+    suspects = []
+    while pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            while pending or futures:
+                while pending and len(futures) < workers * 2:
+                    job = pending.pop(0)
+                    futures[pool.submit(convert_one, job)] = job
+                future = next(as_completed(futures))
+                job = futures.pop(future)
+                if isinstance(future.exception(), BrokenProcessPool):
+                    # Keep what already finished, retry the rest on their own
+                    for other, other_job in futures.items():
+                        if other.done() and other.exception() is None:
+                            yield other.result()
+                        else:
+                            suspects.append(other_job)
+                    suspects.append(job)
+                    break
+                yield future.result()
+    for job in suspects:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                yield pool.submit(convert_one, job).result()
+            except BrokenProcessPool:
+                yield job[0], "failed", "worker process died", 0.0, None
+
+def print_summary(results, elapsed):
+    converted = [r for r in results if r[1] == "converted"]
+    skipped = [r for r in results if r[1] == "skipped"]
+    failed = [r for r in results if r[1] == "failed"]
+    print(f"Decks: {len(results)}  converted: {len(converted)}  "
+          f"skipped: {len(skipped)}  failed: {len(failed)}")
+    if converted:
+        busy = sum(r[3] for r in converted)
+        print(f"Wall time: {elapsed:.2f}s  "
+              f"throughput: {len(converted) / elapsed if elapsed else 0:.1f} decks/s  "
+              f"mean per deck: {busy / len(converted):.3f}s")
+    for pptx_path, _, detail, *_ in failed:
+        print(f"FAILED {pptx_path}: {detail}")
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Convert a directory or manifest of PPTX decks to JSON.")
+    arg_parser.add_argument("source", help="directory of .pptx files or a manifest with one path per line")
+    arg_parser.add_argument("output_dir", help="directory the JSON files are written to")
+    arg_parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    arg_parser.add_argument("--force", action="store_true", help="reconvert decks whose JSON is already up to date")
+    arg_parser.add_argument("--no-copy-media", action="store_true",
+                            help="record media by archive member and hash without copying it")
+    arg_parser.add_argument("--cache", metavar="PATH", default=None,
+                            help="parse cache file shared across runs, so re-uploaded decks only re-parse changed parts")
+    arg_parser.add_argument("--ndjson", action="store_true", help="write one NDJSON record per slide instead of JSON")
+    arg_parser.add_argument("--metrics", metavar="PATH", default=None,
+                            help="write per-deck stage timings and counters to this file as JSON lines")
+    arg_parser.add_argument("--index", metavar="PATH", default=None,
+                            help="full-text index to bring up to date with the outputs after converting")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="show per-deck progress and parser output")
+    args = arg_parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+
+    start = time.perf_counter()
+    results = convert_batch(args.source, args.output_dir, workers=args.workers,
+                            force=args.force, verbose=args.verbose, copy_media=not args.no_copy_media,
+                            cache_path=args.cache, ndjson=args.ndjson, metrics=args.metrics is not None)
+    print_summary(results, time.perf_counter() - start)
+    if args.metrics:
+        with open(args.metrics, 'w') as f:
+            for result in results:
+                for record in result[4] or ():
+                    f.write(json.dumps(record, separators=(',', ':')))
+                    f.write("\n")
+    if args.index:
+        with TextIndex(args.index) as index:
+            indexed, removed = index_outputs(index, args.output_dir)
+        print(f"Index: {indexed} decks indexed, {removed} removed")
+    return 1 if any(r[1] == "failed" for r in results) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
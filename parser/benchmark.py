@@ -0,0 +1,268 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+from media_store import MediaStore
+from ppt_to_xml import build_pptx_xml, write_pptx_xml
+from pptx_package import DirectoryPackage, ZipPackage, load_xml
+from synthetic_deck import generate_deck
+from xml_to_json import collect_records, iter_pptx_records
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 2: peak_rss_bytes is measured per deck in a fresh process and only with --memory
+RESULTS_SCHEMA = 2
+
+STAGES = ("unzip", "build_xml", "xml_write", "xml_reparse", "template", "slides", "json_write", "total")
+
+PRESETS = {
+    "small": {"slides": 5},
+    "medium": {"slides": 50, "table_rows": 4, "table_cols": 4, "charts_per_slide": 1},
+    "large": {"slides": 300, "shapes_per_slide": 10},
+    "media-heavy": {"slides": 40, "images_per_slide": 6, "image_parts": 30, "duplicate_image_parts": 10,
+                    "image_bytes": 64 * 1024},
+    "table-heavy": {"slides": 30, "table_rows": 20, "table_cols": 8},
+    "multi-master": {"slides": 60, "masters": 4, "layouts_per_master": 6},
+}
+DEFAULT_PRESETS = ("small", "medium", "media-heavy")
+
+
+def run_once(pptx_path, work_dir, extract=False):
+    """Convert a deck once, the way main() does, timing each stage.
+
+    Returns ({stage: seconds}, [seconds per slide]).
+    """
+    timings = {}
+    slide_times = []
+    media_store = MediaStore(os.path.join(work_dir, "media"))
+    xml_file = os.path.join(work_dir, "combined.xml")
+    json_file = os.path.join(work_dir, "output.json")
+
+    start = time.perf_counter()
+    if extract:
+        extract_dir = os.path.join(work_dir, "extracted")
+        with zipfile.ZipFile(pptx_path) as zf:
+            zf.extractall(extract_dir)
+        package = DirectoryPackage(extract_dir)
+    else:
+        package = ZipPackage(pptx_path)
+    timings["unzip"] = time.perf_counter() - start
+
+    try:
+        stage_start = time.perf_counter()
+        root = build_pptx_xml(package)
+        timings["build_xml"] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        write_pptx_xml(root, xml_file)
+        timings["xml_write"] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        root = load_xml(xml_file)
+        timings["xml_reparse"] = time.perf_counter() - stage_start
+
+        records = []
+        stage_start = time.perf_counter()
+        for record in iter_pptx_records(root, package, media_store):
+            now = time.perf_counter()
+            if record["record"] == "header":
+                timings["template"] = now - stage_start
+            else:
+                slide_times.append(now - stage_start)
+            records.append(record)
+            stage_start = time.perf_counter()
+        timings["slides"] = sum(slide_times)
+        output_data = collect_records(iter(records))
+
+        stage_start = time.perf_counter()
+        with open(json_file, 'w') as f:
+            json.dump(output_data, f, indent=2)
+        timings["json_write"] = time.perf_counter() - stage_start
+    finally:
+        package.close()
+    timings["total"] = time.perf_counter() - start
+    return timings, slide_times
+
+def summarize(samples):
+    return {"min": min(samples), "median": statistics.median(samples), "max": max(samples)}
+
+def _own_peak_rss():
+    # On Linux ru_maxrss survives fork and exec, so a child started from a big parent
+    # would report the parent's peak; VmHWM belongs to the process's own address space
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+def _rss_run(pptx_path, extract):
+    work_dir = tempfile.mkdtemp(prefix="pptx-bench-")
+    try:
+        run_once(pptx_path, work_dir, extract)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return _own_peak_rss()
+
+def peak_rss_bytes(pptx_path, extract=False):
+    """Peak resident set size of one conversion of a deck, or None where it cannot be read.
+
+    ru_maxrss is a high-water mark for the whole process, so the run happens
+    in a freshly spawned interpreter; otherwise every deck after a bigger one
+    would report the bigger deck's peak.
+    """
+    if resource is None:
+        return None
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_rss_run, pptx_path, extract).result()
+
+def benchmark_deck(name, pptx_path, params=None, repeat=3, extract=False, memory=False):
+    """Benchmark one deck: `repeat` timed conversions plus, with memory=True, a tracemalloc run
+    and a peak RSS run in a fresh process."""
+    runs = []
+    slide_samples = []
+    with zipfile.ZipFile(pptx_path) as zf:
+        infos = zf.infolist()
+    for _ in range(repeat):
+        work_dir = tempfile.mkdtemp(prefix="pptx-bench-")
+        try:
+            timings, slide_times = run_once(pptx_path, work_dir, extract)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        runs.append(timings)
+        slide_samples.extend(slide_times)
+
+    stages = {stage: summarize([run[stage] for run in runs]) for stage in STAGES if stage in runs[0]}
+    slide_count = len(slide_samples) // repeat
+    result = {
+        "deck": name,
+        "path": pptx_path,
+        "params": params,
+        "deck_bytes": os.path.getsize(pptx_path),
+        "uncompressed_bytes": sum(info.file_size for info in infos),
+        "parts": len(infos),
+        "slides": slide_count,
+        "repeat": repeat,
+        "stages": stages,
+        "slide_seconds": {"mean": statistics.mean(slide_samples), "max": max(slide_samples)} if slide_samples else None,
+        "slides_per_second": slide_count / stages["total"]["median"] if stages["total"]["median"] else None,
+    }
+    if memory:
+        result["peak_rss_bytes"] = peak_rss_bytes(pptx_path, extract)
+        work_dir = tempfile.mkdtemp(prefix="pptx-bench-")
+        try:
+            tracemalloc.start()
+            run_once(pptx_path, work_dir, extract)
+            result["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+def run_benchmarks(presets=DEFAULT_PRESETS, decks=(), repeat=3, extract=False, memory=False, corpus_dir=None):
+    """Benchmark synthetic decks for each preset plus any real `decks`, returning the results document."""
+    results = []
+    own_corpus = corpus_dir is None
+    corpus_dir = corpus_dir or tempfile.mkdtemp(prefix="pptx-corpus-")
+    try:
+        for preset in presets:
+            pptx_path = os.path.join(corpus_dir, f"{preset}.pptx")
+            params = generate_deck(pptx_path, **PRESETS[preset])
+            print(f"Benchmarking {preset} ({params['slides']} slides)...")
+            results.append(benchmark_deck(preset, pptx_path, params, repeat, extract, memory))
+        for pptx_path in decks:
+            name = os.path.splitext(os.path.basename(pptx_path))[0]
+            print(f"Benchmarking {name}...")
+            results.append(benchmark_deck(name, pptx_path, None, repeat, extract, memory))
+    finally:
+        if own_corpus:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "lxml": ".".join(map(str, etree.LXML_VERSION)),
+        "platform": platform.platform(),
+        "extract": extract,
+        "results": results,
+    }
+
+def compare_results(baseline, current, tolerance=0.15):
+    """Return regression messages for decks in both documents whose median stage time,
+    or memory peak, grew by more than `tolerance` (a fraction)."""
+    regressions = []
+    baseline_decks = {result["deck"]: result for result in baseline.get("results", [])}
+    for result in current.get("results", []):
+        before = baseline_decks.get(result["deck"])
+        if before is None:
+            continue
+        checks = [(f"{stage} time", before["stages"][stage]["median"], stats["median"])
+                  for stage, stats in result["stages"].items() if stage in before["stages"]]
+        for key in ("peak_rss_bytes", "tracemalloc_peak_bytes"):
+            if before.get(key) and result.get(key):
+                checks.append((key, before[key], result[key]))
+        for label, old, new in checks:
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{result['deck']}: {label} {old:.4g} -> {new:.4g} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+def print_report(document):
+    header = f"{'deck':<14}{'slides':>7}" + "".join(f"{stage:>12}" for stage in STAGES) + f"{'slides/s':>10}"
+    print(header)
+    for result in document["results"]:
+        row = f"{result['deck']:<14}{result['slides']:>7}"
+        row += "".join(f"{result['stages'][stage]['median'] * 1000:>10.1f}ms" if stage in result["stages"]
+                       else f"{'-':>12}" for stage in STAGES)
+        row += f"{result['slides_per_second'] or 0:>10.1f}"
+        print(row)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Time each conversion stage on synthetic (and real) decks.")
+    arg_parser.add_argument("--preset", action="append", choices=sorted(PRESETS),
+                            help=f"synthetic deck to benchmark, repeatable (default: {', '.join(DEFAULT_PRESETS)})")
+    arg_parser.add_argument("--deck", action="append", default=[], help="also benchmark a real .pptx, repeatable")
+    arg_parser.add_argument("-n", "--repeat", type=int, default=3, help="timed conversions per deck")
+    arg_parser.add_argument("--extract", action="store_true", help="extract decks to disk instead of reading the zip")
+    arg_parser.add_argument("--memory", action="store_true", help="add per-deck peak heap (tracemalloc) and peak RSS (fresh process) runs")
+    arg_parser.add_argument("--corpus-dir", help="keep the generated decks in this directory")
+    arg_parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    arg_parser.add_argument("--baseline", help="results file from an earlier version to check for regressions")
+    arg_parser.add_argument("--tolerance", type=float, default=0.15,
+                            help="allowed slowdown or memory growth against the baseline (default 0.15)")
+    args = arg_parser.parse_args(argv)
+
+    if args.corpus_dir:
+        os.makedirs(args.corpus_dir, exist_ok=True)
+    document = run_benchmarks(args.preset or DEFAULT_PRESETS, args.deck, repeat=args.repeat,
+                              extract=args.extract, memory=args.memory, corpus_dir=args.corpus_dir)
+    print_report(document)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"Results saved to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(json.load(f), document, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
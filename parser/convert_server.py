@@ -0,0 +1,510 @@
+import argparse
+import io
+import json
+import logging
+import os
+import shutil
+import signal
+import socketserver
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from batch_convert import _parse_cache, capture_logs, collect_errors
+from media_store import MediaStore
+from xml_to_json import convert, iter_records, write_ndjson
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+# How often a streaming response checks the worker's NDJSON file for new lines
+POLL_INTERVAL = 0.02
+# Extra time the server waits past a request's timeout for the worker to report back
+TIMEOUT_GRACE = 5.0
+# How often a waiting request checks whether its queued conversion has started
+QUEUE_POLL_INTERVAL = 0.25
+# Touched in the request directory by the worker when it starts converting
+STARTED_FILE = "started"
+
+
+class ConversionTimeout(BaseException):
+    """Raised in a worker when its deck runs out of time; not an Exception so the parser's handlers let it through."""
+
+
+def _raise_timeout(signum, frame):
+    raise ConversionTimeout()
+
+def warm_worker(cache_path):
+    """Pool initializer: open the shared parse cache so a worker's first request does not pay for it."""
+    _parse_cache(cache_path)
+
+def _ready():
+    return os.getpid()
+
+def convert_request(pptx_path, output_file, media_dir, cache_path, ndjson, timeout):
+    """Pool worker: convert one deck into output_file, never raising.
+
+    Returns (status, detail) with status "converted", "failed" or "timeout".
+    NDJSON is written straight to output_file, one flushed line per record,
+    so the server can stream it while the deck is still converting. The
+    timeout is enforced in the worker with SIGALRM, so a runaway deck frees
+    its worker instead of holding it forever; it runs from when the worker
+    picks the deck up, which STARTED_FILE records for the server.
+    """
+    log = io.StringIO()
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        open(os.path.join(os.path.dirname(output_file), STARTED_FILE), 'w').close()
+        options = {"media_store": MediaStore(media_dir), "cache": _parse_cache(cache_path)}
+        with capture_logs(log), collect_errors() as errors:
+            if ndjson:
+                with open(output_file, 'w') as f:
+                    converted = write_ndjson(iter_records(pptx_path, **options), f) > 0
+            else:
+                output_data = convert(pptx_path, **options)
+                converted = output_data is not None
+                if converted:
+                    with open(output_file, 'w') as f:
+                        json.dump(output_data, f)
+        if not converted:
+            return "failed", errors.detail()
+        return "converted", None
+    except ConversionTimeout:
+        return "timeout", f"conversion exceeded {timeout:g}s"
+    except Exception as e:
+        return "failed", f"{type(e).__name__}: {e}"
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ConversionService:
+    """A warm process pool that converts decks with bounded admission.
+
+    At most `workers` conversions run at once and at most `queue_size` more
+    wait for a worker; anything beyond that is rejected right away (reserve()
+    returns False) instead of piling up. A request reserves its slot before
+    its upload is read, so a full service does not buffer bodies it is going
+    to turn away. Every request gets its own directory under work_dir for
+    the upload, the output and (with copy_media) its media store, so
+    concurrent requests never share a temp file or a media path. Directories
+    are removed once both the request and its conversion are finished,
+    unless keep_outputs is set.
+
+    A conversion's timeout runs from when a worker starts it, not from when
+    it was queued; time spent waiting for a worker is bounded by the queue
+    size instead.
+    """
+
+    def __init__(self, workers=None, queue_size=None, timeout=120.0, work_dir=None, cache_path=None,
+                 copy_media=False, keep_outputs=False, allowed_roots=()):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = self.workers * 2 if queue_size is None else queue_size
+        self.timeout = timeout
+        self._owns_work_dir = work_dir is None
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="pptx-convert-")
+        self.cache_path = cache_path
+        self.copy_media = copy_media
+        self.keep_outputs = keep_outputs
+        self.allowed_roots = [os.path.realpath(root) for root in allowed_roots]
+        os.makedirs(self.work_dir, exist_ok=True)
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._counts = {"accepted": 0, "rejected": 0, "converted": 0, "failed": 0, "timeout": 0}
+        self._in_flight = 0
+        self._executor = None
+        self._start_pool()
+
+    def _start_pool(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker,
+                                             initargs=(self.cache_path,))
+        # Make the pool start its processes now rather than when the first requests arrive
+        for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        logger.info("Started %d workers", self.workers)
+
+    def _restart_pool(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                logger.warning("Worker pool broke, restarting it")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._start_pool()
+
+    def new_request_dir(self):
+        request_id = uuid.uuid4().hex
+        request_dir = os.path.join(self.work_dir, request_id)
+        os.makedirs(request_dir)
+        return request_id, request_dir
+
+    def finish_request(self, request_dir, future=None):
+        """Remove a request's directory, or with `future`, once that conversion is done with it."""
+        if self.keep_outputs:
+            return
+        if future is not None:
+            # A conversion the client stopped waiting for may still be queued or running
+            future.add_done_callback(lambda f: shutil.rmtree(request_dir, ignore_errors=True))
+        else:
+            shutil.rmtree(request_dir, ignore_errors=True)
+
+    def resolve_path(self, path):
+        """Realpath of a deck the client named by path, or None if it is outside every allowed root."""
+        real = os.path.realpath(path)
+        if any(os.path.commonpath([real, root]) == root for root in self.allowed_roots):
+            return real
+        return None
+
+    def reserve(self):
+        """Take an admission slot for a request, or return False (counted as rejected) if the service is full.
+
+        A reserved slot is handed to the conversion by submit(); a request
+        that ends before submitting must give it back with unreserve().
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            return False
+        return True
+
+    def unreserve(self):
+        self._slots.release()
+
+    def submit(self, pptx_path, request_dir, ndjson=False, uploaded=True):
+        """Queue a conversion on a slot taken by reserve() and return (future, output_file).
+
+        Uploaded decks never use the parse cache: its keys come from the zip
+        central directory (CRC-32 and size), which an uploader controls, so a
+        crafted upload could be served another deck's cached parts. Only decks
+        read from the allowed roots (uploaded=False) share it.
+        """
+        output_file = os.path.join(request_dir, "output.ndjson" if ndjson else "output.json")
+        media_dir = os.path.join(request_dir, "media") if self.copy_media else None
+        cache_path = None if uploaded else self.cache_path
+        executor = self._executor
+        try:
+            future = executor.submit(convert_request, pptx_path, output_file, media_dir, cache_path, ndjson,
+                                     self.timeout)
+        except BrokenProcessPool:
+            self._restart_pool(executor)
+            raise
+        self._count("accepted")
+        with self._lock:
+            self._in_flight += 1
+        # The slot is held until the worker is really done, even if the client gave up waiting
+        future.add_done_callback(lambda f: self._release(f, executor))
+        return future, output_file
+
+    def _release(self, future, executor):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self._count("failed")
+            if isinstance(future.exception(), BrokenProcessPool):
+                threading.Thread(target=self._restart_pool, args=(executor,), daemon=True).start()
+        else:
+            self._count(future.result()[0])
+
+    def time_left(self, request_dir):
+        """Seconds before a started conversion is overdue (grace included), or None while it is still queued."""
+        try:
+            started = os.stat(os.path.join(request_dir, STARTED_FILE)).st_mtime
+        except FileNotFoundError:
+            return None
+        return started + self.timeout + TIMEOUT_GRACE - time.time()
+
+    def give_up(self, future):
+        """Stop waiting for an overdue conversion: drop it if it never started, and report a timeout."""
+        if future.cancel():
+            self._count("timeout")
+        return "timeout", f"conversion exceeded {self.timeout:g}s"
+
+    def wait(self, future, request_dir):
+        """The worker's (status, detail), or ("timeout", ...) if it did not report back in time."""
+        while True:
+            left = self.time_left(request_dir)
+            if left is not None and left <= 0:
+                return self.give_up(future)
+            try:
+                return future.result(timeout=QUEUE_POLL_INTERVAL if left is None else left)
+            except FutureTimeout:
+                continue
+            except CancelledError:
+                return "failed", "conversion cancelled"
+            except BrokenProcessPool:
+                return "failed", "worker process died"
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "queue_size": self.queue_size, "in_flight": self._in_flight,
+                    **self._counts}
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._owns_work_dir and not self.keep_outputs:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class ConvertHandler(BaseHTTPRequestHandler):
+    """POST /convert with a .pptx body, or a {"path": ...} JSON body naming a deck on the server.
+
+    ?format=ndjson streams one record per line (chunked) as slides are
+    converted; otherwise the whole output JSON is returned. GET /health
+    reports the pool's load and counters.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "pptx-convert"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+
+    def send_json(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message, headers=()):
+        self.send_json(status, {"error": message}, headers)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self.send_json(200, self.service.stats())
+        else:
+            self.send_error_json(404, "not found")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/convert":
+            self.send_error_json(404, "not found")
+            return
+        ndjson = parse_qs(url.query).get("format", ["json"])[0] == "ndjson"
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.send_error_json(411, "Content-Length required")
+            self.close_connection = True
+            return
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_error_json(400, "invalid Content-Length")
+            self.close_connection = True
+            return
+        if length > self.server.max_upload:
+            self.send_error_json(413, f"upload larger than {self.server.max_upload} bytes")
+            self.close_connection = True
+            return
+
+        if not self.service.reserve():
+            # The body is left unread, so this connection cannot be reused
+            self.send_error_json(503, "server busy", [("Retry-After", "1")])
+            self.close_connection = True
+            return
+        submitted = False
+        request_id, request_dir = None, None
+        try:
+            request_id, request_dir = self.service.new_request_dir()
+            deck = self.read_deck(request_dir, length)
+            if deck is None:
+                return
+            pptx_path, uploaded = deck
+            future, output_file = self.service.submit(pptx_path, request_dir, ndjson, uploaded)
+            submitted = True
+            headers = [("X-Request-Id", request_id)]
+            if ndjson:
+                self.stream_ndjson(future, request_dir, output_file, headers)
+            else:
+                self.send_output(future, request_dir, output_file, headers)
+        finally:
+            if not submitted:
+                self.service.unreserve()
+            if request_dir is not None:
+                self.service.finish_request(request_dir, future if submitted else None)
+
+    def read_deck(self, request_dir, length):
+        """Save an upload into the request directory, or resolve a {"path"} body.
+
+        Returns (pptx_path, uploaded), or None after an error reply.
+        """
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                path = json.loads(self.rfile.read(length))["path"]
+                if not isinstance(path, str):
+                    raise TypeError("path must be a string")
+            except (ValueError, KeyError, TypeError):
+                self.send_error_json(400, 'expected {"path": "..."}')
+                return None
+            pptx_path = self.service.resolve_path(path)
+            if pptx_path is None:
+                self.send_error_json(403, "path is outside the allowed roots")
+                return None
+            if not os.path.isfile(pptx_path):
+                self.send_error_json(404, "no such deck")
+                return None
+            return pptx_path, False
+        pptx_path = os.path.join(request_dir, "upload.pptx")
+        remaining = length
+        with open(pptx_path, 'wb') as f:
+            while remaining:
+                chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    self.send_error_json(400, "upload ended early")
+                    self.close_connection = True
+                    return None
+                f.write(chunk)
+                remaining -= len(chunk)
+        return pptx_path, True
+
+    def send_output(self, future, request_dir, output_file, headers):
+        status, detail = self.service.wait(future, request_dir)
+        if status == "timeout":
+            self.send_error_json(504, detail, headers)
+        elif status != "converted":
+            self.send_error_json(422, detail, headers)
+        else:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(os.path.getsize(output_file)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            with open(output_file, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+    def stream_ndjson(self, future, request_dir, output_file, headers):
+        """Relay the worker's NDJSON file line by line while it is written.
+
+        Errors before the first record get a plain error status; once
+        streaming has started, a failure is reported as a final
+        {"record": "error"} line.
+        """
+        started = False
+        position = 0
+        while True:
+            done = future.done()
+            lines = b""
+            if os.path.exists(output_file):
+                with open(output_file, 'rb') as f:
+                    f.seek(position)
+                    data = f.read()
+                # Only whole lines: the worker may be midway through writing the last one
+                end = data.rfind(b"\n") + 1
+                lines, position = data[:end], position + end
+            if lines:
+                if not started:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    for name, value in headers:
+                        self.send_header(name, value)
+                    self.end_headers()
+                    started = True
+                self.write_chunk(lines)
+            if done:
+                status, detail = self.service.wait(future, request_dir)
+                break
+            left = self.service.time_left(request_dir)
+            if left is not None and left <= 0:
+                status, detail = self.service.give_up(future)
+                break
+            time.sleep(POLL_INTERVAL)
+
+        if not started:
+            if status == "timeout":
+                self.send_error_json(504, detail, headers)
+            else:
+                self.send_error_json(422, detail or "conversion failed", headers)
+            return
+        if status != "converted":
+            self.write_chunk(json.dumps({"record": "error", "status": status, "detail": detail}).encode() + b"\n")
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class ConvertServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, max_upload):
+        self.service = service
+        self.max_upload = max_upload
+        super().__init__(address, ConvertHandler)
+
+
+class UnixConvertServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, service, max_upload):
+        self.service = service
+        self.max_upload = max_upload
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, ConvertHandler)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Serve deck conversions over HTTP from a warm worker pool.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--socket", metavar="PATH", default=None, help="listen on a Unix socket instead")
+    arg_parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    arg_parser.add_argument("--queue", type=int, default=None,
+                            help="requests allowed to wait for a worker before new ones get 503 (default: 2 per worker)")
+    arg_parser.add_argument("--timeout", type=float, default=120.0, help="seconds allowed per conversion")
+    arg_parser.add_argument("--max-upload", type=int, default=200 << 20, help="largest accepted upload in bytes")
+    arg_parser.add_argument("--work-dir", default=None, help="where per-request directories are created")
+    arg_parser.add_argument("--keep-outputs", action="store_true", help="keep per-request directories after replying")
+    arg_parser.add_argument("--copy-media", action="store_true",
+                            help="copy each request's media into its request directory (useful with --keep-outputs)")
+    arg_parser.add_argument("--cache", metavar="PATH", default=None, help="parse cache shared by the workers (used for --allow-path decks, never for uploads)")
+    arg_parser.add_argument("--allow-path", action="append", default=[], metavar="DIR",
+                            help='allow {"path": ...} requests for decks under DIR (repeatable)')
+    args = arg_parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    service = ConversionService(workers=args.workers, queue_size=args.queue, timeout=args.timeout,
+                                work_dir=args.work_dir, cache_path=args.cache, copy_media=args.copy_media,
+                                keep_outputs=args.keep_outputs, allowed_roots=args.allow_path)
+    if args.socket:
+        server = UnixConvertServer(args.socket, service, args.max_upload)
+        logger.info("Listening on %s", args.socket)
+    else:
+        server = ConvertServer((args.host, args.port), service, args.max_upload)
+        logger.info("Listening on http://%s:%d", args.host, args.port)
+    # Stop cleanly on SIGTERM too; shutdown() has to be called from outside the serving thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+from dataclasses import dataclass, fields
+from typing import ClassVar, Optional
+
+
+class _Unset:
+    """Marks a shape style key the source dict did not have, so to_dict() round-trips exactly."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return "UNSET"
+
+    def __reduce__(self):
+        return "_UNSET"
+
+_UNSET = _Unset()
+
+
+@dataclass(frozen=True, slots=True)
+class Position:
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def to_dict(self):
+        return {"x": self.x, "y": self.y, "width": self.width, "height": self.height}
+
+
+@dataclass(frozen=True, slots=True)
+class TextStyle:
+    """Run attributes as produced by extract_text_attributes; interned, so compare with `is`."""
+    size: float
+    bold: bool
+    italic: bool
+    underline: bool
+    font: str
+    color: str
+
+    def to_dict(self):
+        return {"size": self.size, "bold": self.bold, "italic": self.italic, "underline": self.underline,
+                "font": self.font, "color": self.color}
+
+
+@dataclass(frozen=True, slots=True)
+class ShapeStyle:
+    """Shape style as produced by extract_shape_style; keys the shape did not have stay unset."""
+    fill_color: Optional[str] = _UNSET
+    border_color: Optional[str] = _UNSET
+    border_width: Optional[float] = _UNSET
+    rotation: Optional[float] = _UNSET
+
+    def to_dict(self):
+        return {f.name: getattr(self, f.name) for f in fields(self) if getattr(self, f.name) is not _UNSET}
+
+
+def _position(position):
+    return Position(position["x"], position["y"], position["width"], position["height"])
+
+
+class StyleTable:
+    """Interns text and shape styles so identical ones share a single object.
+
+    One table can be shared across the slides of a deck or a whole corpus;
+    decks tend to use a handful of distinct run styles, so millions of runs
+    end up pointing at a few dozen style objects.
+    """
+
+    def __init__(self):
+        self._styles = {}
+
+    def _intern(self, style):
+        return self._styles.setdefault(style, style)
+
+    def text_style(self, attrs):
+        return self._intern(TextStyle(float(attrs["size"]), attrs["bold"], attrs["italic"], attrs["underline"],
+                                      attrs["font"], attrs["color"]))
+
+    def shape_style(self, style):
+        return self._intern(ShapeStyle(**style))
+
+    def __len__(self):
+        return len(self._styles)
+
+
+@dataclass(slots=True)
+class TextRun:
+    text: str
+    style: TextStyle
+
+    def to_dict(self):
+        return {"text": self.text, "attributes": self.style.to_dict()}
+
+
+@dataclass(slots=True)
+class TextElement:
+    type: ClassVar[str] = "text"
+    content: list
+    position: Position
+    shape_background: Optional[str]
+    z_order: int
+    is_header: bool
+    is_background: bool
+    is_page_number: bool
+
+    @classmethod
+    def from_dict(cls, element, styles):
+        return cls([TextRun(run["text"], styles.text_style(run["attributes"])) for run in element["content"]],
+                   _position(element["position"]), element["shape_background"], element["z_order"],
+                   element["is_header"], element["is_background"], element["is_page_number"])
+
+    def to_dict(self):
+        return {"type": self.type, "content": [run.to_dict() for run in self.content],
+                "position": self.position.to_dict(), "shape_background": self.shape_background,
+                "z_order": self.z_order, "is_header": self.is_header, "is_background": self.is_background,
+                "is_page_number": self.is_page_number}
+
+
+@dataclass(slots=True)
+class ShapeElement:
+    type: ClassVar[str] = "shape"
+    shape_type: str
+    position: Position
+    style: ShapeStyle
+    z_order: int
+
+    @classmethod
+    def from_dict(cls, element, styles):
+        return cls(element["shape_type"], _position(element["position"]),
+                   styles.shape_style(element["style"]), element["z_order"])
+
+    def to_dict(self):
+        return {"type": self.type, "shape_type": self.shape_type, "position": self.position.to_dict(),
+                "style": self.style.to_dict(), "z_order": self.z_order}
+
+
+@dataclass(slots=True)
+class ImageElement:
+    type: ClassVar[str] = "image"
+    sha256: str
+    part: str
+    file: Optional[str]
+    position: Position
+    z_order: int
+
+    @classmethod
+    def from_dict(cls, element, styles):
+        return cls(element["sha256"], element["part"], element["file"], _position(element["position"]),
+                   element["z_order"])
+
+    def to_dict(self):
+        return {"type": self.type, "sha256": self.sha256, "part": self.part, "file": self.file,
+                "position": self.position.to_dict(), "z_order": self.z_order}
+
+
+@dataclass(slots=True)
+class TableCell:
+    content: str
+    style: TextStyle
+
+    def to_dict(self):
+        return {"content": self.content, "attributes": self.style.to_dict()}
+
+
+@dataclass(slots=True)
+class TableElement:
+    type: ClassVar[str] = "table"
+    position: Position
+    rows: list
+    z_order: int
+
+    @classmethod
+    def from_dict(cls, element, styles):
+        rows = [[TableCell(cell["content"], styles.text_style(cell["attributes"])) for cell in row]
+                for row in element["rows"]]
+        return cls(_position(element["position"]), rows, element["z_order"])
+
+    def to_dict(self):
+        return {"type": self.type, "position": self.position.to_dict(),
+                "rows": [[cell.to_dict() for cell in row] for row in self.rows], "z_order": self.z_order}
+
+
+@dataclass(slots=True)
+class ChartElement:
+    type: ClassVar[str] = "chart"
+    chart_file: Optional[str]
+    sha256: str
+    part: str
+    position: Position
+    z_order: int
+
+    @classmethod
+    def from_dict(cls, element, styles):
+        return cls(element["chart_file"], element["sha256"], element["part"], _position(element["position"]),
+                   element["z_order"])
+
+    def to_dict(self):
+        return {"type": self.type, "chart_file": self.chart_file, "sha256": self.sha256, "part": self.part,
+                "position": self.position.to_dict(), "z_order": self.z_order}
+
+
+ELEMENT_TYPES = {cls.type: cls for cls in (TextElement, ShapeElement, ImageElement, TableElement, ChartElement)}
+
+
+@dataclass(slots=True)
+class Slide:
+    index: int
+    layout: Optional[str]
+    master: Optional[str]
+    background: dict
+    elements: list
+    error: Optional[str] = None
+
+    def to_record(self):
+        """The slide as the {"record": "slide", ...} dict iter_pptx_records yields."""
+        record = {"record": "slide", "index": self.index, "layout": self.layout, "master": self.master,
+                  "background": self.background, "elements": [element.to_dict() for element in self.elements]}
+        if self.error is not None:
+            record["error"] = self.error
+        return record
+
+
+def element_from_dict(element, styles):
+    return ELEMENT_TYPES[element["type"]].from_dict(element, styles)
+
+def slide_from_record(record, styles):
+    """Typed, compact copy of a slide record; styles are interned in `styles`."""
+    return Slide(record["index"], record.get("layout"), record.get("master"), record["background"],
+                 [element_from_dict(element, styles) for element in record["elements"]], record.get("error"))
+
+def iter_slides(records, styles=None):
+    """Turn an iter_records stream into Slide objects, skipping the header record.
+
+    Pass one StyleTable for a whole corpus so styles are shared across decks.
+    """
+    styles = styles if styles is not None else StyleTable()
+    for record in records:
+        if record["record"] == "slide":
+            yield slide_from_record(record, styles)
@@ -0,0 +1,108 @@
+import json
+import sys
+from array import array
+
+# Element type codes stored in the "type" column
+TYPE_CODES = {"text": 0, "shape": 1, "image": 2, "table": 3, "chart": 4}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+# column name -> array typecode; EMU offsets can be negative and exceed 32 bits
+COLUMNS = {
+    "deck": "I",
+    "slide": "I",
+    "type": "B",
+    "z_order": "i",
+    "x": "q",
+    "y": "q",
+    "width": "q",
+    "height": "q",
+}
+
+NUMPY_DTYPES = {"I": "uint32", "B": "uint8", "i": "int32", "q": "int64"}
+
+
+class GeometryColumns:
+    """Positions, z-orders and types of every element across a deck or corpus, packed column-wise.
+
+    Each column is a typed array with one entry per element, so a million
+    elements cost ~45 bytes each instead of a dict per position. to_numpy()
+    wraps the columns without copying for vectorized layout analysis; numpy
+    is only needed for that.
+    """
+
+    def __init__(self):
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.decks = []
+
+    def add_deck(self, name):
+        """Register a deck and return its id for the "deck" column."""
+        self.decks.append(name)
+        return len(self.decks) - 1
+
+    def add_slide(self, deck_id, slide_index, elements):
+        """Append a slide's elements, given as output dicts or elements.py objects."""
+        columns = self.columns
+        for element in elements:
+            if isinstance(element, dict):
+                kind, z_order, position = element["type"], element["z_order"], element["position"]
+                x, y, width, height = position["x"], position["y"], position["width"], position["height"]
+            else:
+                kind, z_order, position = element.type, element.z_order, element.position
+                x, y, width, height = position.x, position.y, position.width, position.height
+            columns["deck"].append(deck_id)
+            columns["slide"].append(slide_index)
+            columns["type"].append(TYPE_CODES[kind])
+            columns["z_order"].append(z_order)
+            columns["x"].append(x)
+            columns["y"].append(y)
+            columns["width"].append(width)
+            columns["height"].append(height)
+
+    def add_records(self, name, records):
+        """Append every slide of an iter_records stream (or of elements.iter_slides) as deck `name`."""
+        deck_id = self.add_deck(name)
+        for record in records:
+            if isinstance(record, dict):
+                if record["record"] == "slide":
+                    self.add_slide(deck_id, record["index"], record["elements"])
+            else:
+                self.add_slide(deck_id, record.index, record.elements)
+        return deck_id
+
+    def __len__(self):
+        return len(self.columns["type"])
+
+    def to_numpy(self):
+        """Return {column: numpy array} views of the columns (no copy); requires numpy."""
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("GeometryColumns.to_numpy() requires numpy (pip install numpy)") from None
+        return {name: np.frombuffer(column, dtype=NUMPY_DTYPES[column.typecode])
+                for name, column in self.columns.items()}
+
+    def save(self, path):
+        """Write the columns as a one-line JSON header followed by the raw arrays."""
+        header = {
+            "byteorder": sys.byteorder,
+            "decks": self.decks,
+            "columns": [[name, column.typecode, len(column)] for name, column in self.columns.items()],
+        }
+        with open(path, 'wb') as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            for column in self.columns.values():
+                column.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        geometry = cls()
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            geometry.decks = header["decks"]
+            for name, typecode, length in header["columns"]:
+                column = array(typecode)
+                column.fromfile(f, length)
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+                geometry.columns[name] = column
+        return geometry
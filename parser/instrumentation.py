@@ -0,0 +1,184 @@
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# The active Recorder, or None. Every hook checks this first, so with
+# instrumentation off a hook costs one global lookup.
+_recorder = None
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class Recorder:
+    """Stage durations, counters and one-off events for one conversion (or one batch).
+
+    Stage times are inclusive: a stage nested in another (e.g. extract_image
+    inside parse_slide) is counted in both.
+    """
+
+    def __init__(self, deck=None):
+        self.deck = deck
+        self.seconds = defaultdict(float)
+        self.calls = Counter()
+        self.counters = Counter()
+        self.events = []
+
+    def add_time(self, name, seconds):
+        self.seconds[name] += seconds
+        self.calls[name] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def event(self, kind, **fields):
+        self.events.append({"kind": kind, **fields})
+
+    def snapshot(self):
+        """Plain-data copy that can cross a process boundary and be merged back with merge()."""
+        return {"seconds": dict(self.seconds), "calls": dict(self.calls),
+                "counters": dict(self.counters), "events": list(self.events)}
+
+    def merge(self, snapshot):
+        for name, seconds in snapshot["seconds"].items():
+            self.seconds[name] += seconds
+        self.calls.update(snapshot["calls"])
+        self.counters.update(snapshot["counters"])
+        self.events.extend(snapshot["events"])
+
+    def records(self):
+        """Yield everything recorded as flat dicts, one per stage, counter and event."""
+        tag = {"deck": self.deck} if self.deck is not None else {}
+        for name in sorted(self.seconds):
+            yield {**tag, "kind": "stage", "name": name, "seconds": round(self.seconds[name], 6),
+                   "calls": self.calls[name]}
+        for name in sorted(self.counters):
+            yield {**tag, "kind": "counter", "name": name, "value": self.counters[name]}
+        for event in self.events:
+            yield {**tag, **event}
+
+    def write_jsonl(self, f):
+        for record in self.records():
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write("\n")
+
+
+def enabled():
+    return _recorder is not None
+
+def active():
+    return _recorder
+
+@contextlib.contextmanager
+def recording(recorder=None):
+    """Send instrumentation from the code run inside the block to `recorder` (a new one by default)."""
+    global _recorder
+    previous = _recorder
+    _recorder = recorder if recorder is not None else Recorder()
+    try:
+        yield _recorder
+    finally:
+        _recorder = previous
+
+class _Stage:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.add_time(self.name, time.perf_counter() - self.start)
+
+def stage(name):
+    """Context manager timing a block as stage `name`; a shared no-op when nothing is recording."""
+    recorder = _recorder
+    if recorder is None:
+        return _NULL_STAGE
+    return _Stage(recorder, name)
+
+def timed(name):
+    """Decorator timing every call of a (non-generator) function as stage `name`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.add_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def increment(name, n=1):
+    recorder = _recorder
+    if recorder is not None:
+        recorder.count(name, n)
+
+@contextlib.contextmanager
+def profiling(kind, output_file=None, top=20):
+    """Attach a profiler to the code run inside the block, e.g. a single conversion.
+
+    kind="cprofile" records the `top` functions by cumulative time (and dumps
+    the full stats to output_file for snakeviz/pstats); kind="tracemalloc"
+    records the peak heap and the `top` allocation sites still live at the
+    end. Results go to the active recorder as "profile" events, or to the log
+    if nothing is recording.
+    """
+    if kind == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if output_file:
+                profiler.dump_stats(output_file)
+            stats = pstats.Stats(profiler, stream=io.StringIO()).sort_stats("cumulative")
+            functions = []
+            for (filename, line, func), (_, calls, own, cumulative, _) in stats.stats.items():
+                functions.append({"function": f"{filename}:{line}({func})", "calls": calls,
+                                  "own_seconds": round(own, 6), "cumulative_seconds": round(cumulative, 6)})
+            functions.sort(key=lambda entry: entry["cumulative_seconds"], reverse=True)
+            _report_profile({"profiler": "cprofile", "output_file": output_file, "top": functions[:top]})
+    elif kind == "tracemalloc":
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+            if output_file:
+                snapshot.dump(output_file)
+            sites = [{"where": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                     for stat in snapshot.statistics("lineno")[:top]]
+            _report_profile({"profiler": "tracemalloc", "output_file": output_file,
+                             "peak_bytes": peak, "current_bytes": current, "top": sites})
+    else:
+        raise ValueError(f"Unknown profiler {kind!r}, expected 'cprofile' or 'tracemalloc'")
+
+def _report_profile(result):
+    recorder = _recorder
+    if recorder is not None:
+        recorder.event("profile", **result)
+    else:
+        logger.info("Profile: %s", json.dumps(result))
@@ -0,0 +1,55 @@
+import posixpath
+from dataclasses import dataclass
+from typing import Optional
+
+MiB = 1 << 20
+
+# Parts read into memory as XML trees; every other part (media, embeddings) is only ever streamed
+XML_SUFFIXES = (".xml", ".rels")
+
+
+class LimitExceeded(ValueError):
+    """A deck is larger than the configured Limits allow."""
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Size limits for one deck; None turns a check off.
+
+    The archive checks run on the zip central directory before any part is
+    read or extracted, so an oversized deck or zip bomb is rejected without
+    inflating anything (zipfile also never inflates a member past the size
+    the central directory declares). Slide parts larger than
+    stream_part_bytes are parsed incrementally instead of as one tree.
+    """
+    max_total_bytes: Optional[int] = 2048 * MiB
+    max_part_bytes: Optional[int] = 256 * MiB
+    max_slides: Optional[int] = 5000
+    max_table_cells: Optional[int] = 250_000
+    stream_part_bytes: int = 8 * MiB
+
+
+DEFAULT_LIMITS = Limits()
+
+
+def check_archive(zip_file, limits):
+    """Raise LimitExceeded if an open zipfile's declared sizes or slide count are over `limits`.
+
+    max_part_bytes applies to the XML and rels parts the parser loads;
+    media only counts towards max_total_bytes.
+    """
+    total = 0
+    slides = 0
+    for info in zip_file.infolist():
+        total += info.file_size
+        name = info.filename
+        if limits.max_part_bytes is not None and name.endswith(XML_SUFFIXES) \
+                and info.file_size > limits.max_part_bytes:
+            raise LimitExceeded(f"part {name} is {info.file_size} bytes uncompressed "
+                                f"(limit {limits.max_part_bytes})")
+        if posixpath.dirname(name) == "ppt/slides" and name.endswith(".xml"):
+            slides += 1
+    if limits.max_total_bytes is not None and total > limits.max_total_bytes:
+        raise LimitExceeded(f"archive is {total} bytes uncompressed (limit {limits.max_total_bytes})")
+    if limits.max_slides is not None and slides > limits.max_slides:
+        raise LimitExceeded(f"deck has {slides} slides (limit {limits.max_slides})")
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+from instrumentation import increment, stage
+
+CHUNK_SIZE = 1 << 20
+
+
+class MediaStore:
+    """Content-addressed store for media and chart parts.
+
+    Each unique blob is written once as {root_dir}/{hash[:2]}/{hash}{ext}, so a
+    logo repeated on every slide (or across decks sharing the store) costs one
+    file. A part is read once: it is hashed while being streamed into a temp
+    file, which is then renamed into place (or dropped if that blob is
+    already stored), so concurrent runs sharing a store never see partial
+    files or clobber each other.
+
+    With root_dir=None the store is reference-only: parts are hashed straight
+    from the archive and recorded by member name and hash, and no bytes are
+    copied anywhere.
+    """
+
+    def __init__(self, root_dir=None):
+        self.root_dir = root_dir
+        self._refs = {}  # (package source, part name) -> media reference
+
+    @property
+    def reference_only(self):
+        return self.root_dir is None
+
+    def path_for(self, digest, part_name):
+        ext = posixpath.splitext(part_name)[1].lower()
+        return os.path.join(self.root_dir, digest[:2], f"{digest}{ext}")
+
+    def add(self, package, part_name):
+        """Store a package part and return {"sha256", "part", "file"}.
+
+        "file" is the stored blob's path, or None for a reference-only store.
+        Repeated calls for the same part of the same package are answered
+        from memory without reading the archive again.
+        """
+        key = (package.source, part_name)
+        ref = self._refs.get(key)
+        if ref is not None:
+            return ref
+
+        with stage("media_store"):
+            if self.reference_only:
+                digest, size = self._hash_part(package, part_name, None)
+                file_path = None
+            else:
+                os.makedirs(self.root_dir, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, 'wb') as dst:
+                        digest, size = self._hash_part(package, part_name, dst)
+                    file_path = self.path_for(digest, part_name)
+                    if os.path.exists(file_path):
+                        increment("media_deduplicated")
+                        os.remove(tmp_path)
+                    else:
+                        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                        os.replace(tmp_path, file_path)
+                        increment("bytes_copied", size)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            increment("media_parts")
+            increment("bytes_read", size)
+
+        ref = {"sha256": digest, "part": part_name, "file": file_path}
+        self._refs[key] = ref
+        return ref
+
+    @staticmethod
+    def _hash_part(package, part_name, dst):
+        """Read a part once, hashing it and (if dst is given) copying it; returns (hex digest, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        with package.open_part(part_name) as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+                if dst is not None:
+                    dst.write(chunk)
+        return digest.hexdigest(), size
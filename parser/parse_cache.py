@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from instrumentation import increment
+
+# Bump whenever parse_slide/parse_master/parse_layout/parse_theme output changes,
+# so stale entries from an older parser are never spliced into new output.
+CACHE_VERSION = 2
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Keys per SELECT ... IN (...) in get_many, under SQLite's bound-parameter limit
+LOOKUP_BATCH = 500
+# Parsed parts a DeckCache holds before writing them out in one transaction
+WRITE_BATCH = 128
+
+
+def part_cache_key(package, kind, part_name, depends_on=(), extra=()):
+    """Cache key for one parsed part: its own checksum plus those of the parts it depends on.
+
+    Checksums come from package.fingerprint (zip member CRC and size), so
+    building a key never reads or decompresses the part itself. Returns None
+    if the part is missing.
+    """
+    fingerprint = package.fingerprint(part_name)
+    if fingerprint is None:
+        return None
+    h = hashlib.sha256()
+    h.update(f"{CACHE_VERSION}\0{kind}\0{part_name}\0{fingerprint}".encode())
+    for dep in sorted(set(depends_on)):
+        h.update(f"\0{dep}={package.fingerprint(dep)}".encode())
+    for value in extra:
+        h.update(f"\0{value!r}".encode())
+    return h.hexdigest()
+
+
+class ParseCache:
+    """Persistent, size-bounded LRU cache of per-part parse results.
+
+    Entries live in one SQLite file (WAL mode), so several converter processes
+    can share a cache. Values are JSON, zlib-compressed. When the stored size
+    goes over max_bytes the least recently used entries are evicted down to
+    90% of the limit. get_many() and put_many() do a whole batch in one
+    transaction; with WAL, synchronous=NORMAL keeps commits cheap without
+    risking corruption (a power cut can only lose the last commits).
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS entries ("
+                        "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._total = self._stored_bytes()
+
+    def _stored_bytes(self):
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key):
+        row = self.db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def get_many(self, keys):
+        """{key: value} for the given keys that are cached, marking them used in a single transaction."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            found.update(self.db.execute(f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(batch))})",
+                                         batch))
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        if found:
+            now = time.time()
+            self._write(lambda: self.db.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                                    ((now, key) for key in found)))
+        return {key: json.loads(zlib.decompress(blob)) for key, blob in found.items()}
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """Store (key, value) pairs in a single transaction."""
+        now = time.time()
+        rows = [(key, blob, len(blob), now)
+                for key, blob in ((key, zlib.compress(json.dumps(value, separators=(',', ':')).encode(), 1))
+                                  for key, value in items)]
+        if not rows:
+            return
+        self._write(lambda: self.db.executemany(
+            "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)", rows))
+        self._total += sum(row[2] for row in rows)
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def _write(self, statements):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            statements()
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def evict(self):
+        """Drop least recently used entries until the cache is at 90% of max_bytes."""
+        self._total = self._stored_bytes()
+        target = int(self.max_bytes * 0.9)
+        while self._total > target:
+            rows = self.db.execute("SELECT key, size FROM entries ORDER BY last_used LIMIT 256").fetchall()
+            if not rows:
+                break
+            dropped = []
+            for key, size in rows:
+                if self._total <= target:
+                    break
+                dropped.append((key,))
+                self._total -= size
+            self.db.executemany("DELETE FROM entries WHERE key = ?", dropped)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total}
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DeckCache:
+    """One deck's view of a ParseCache: the keys of its parts and the hits found up front.
+
+    `keys` maps part name -> cache key. Hits are looked up once, in one
+    query, before the combined tree is built, so cached parts never need to
+    be loaded. An optional `validate(part_name, value)` can reject a hit
+    (e.g. when media it references has since been removed from the media
+    store). Newly parsed parts are written in batches of WRITE_BATCH; call
+    flush() when the deck is done to write the rest.
+    """
+
+    def __init__(self, cache, keys, validate=None):
+        self.cache = cache
+        self.keys = keys
+        self.hits = {}
+        self._pending = []
+        found = cache.get_many(key for key in keys.values() if key is not None)
+        for part_name, key in keys.items():
+            if key is None:
+                continue
+            value = found.get(key)
+            if value is None:
+                increment("cache_misses")
+            elif validate is None or validate(part_name, value):
+                self.hits[part_name] = value
+                increment("cache_hits")
+            else:
+                increment("cache_rejected")
+
+    def get(self, part_name):
+        return self.hits.get(part_name)
+
+    def put(self, part_name, value):
+        key = self.keys.get(part_name)
+        if key is not None:
+            self._pending.append((key, value))
+            if len(self._pending) >= WRITE_BATCH:
+                self.flush()
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        self.cache.put_many(pending)
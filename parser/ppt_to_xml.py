@@ -1,6 +1,11 @@
+import logging
 import os
+import posixpath
 import zipfile
 from lxml import etree
+from instrumentation import increment, stage, timed
+from limits import DEFAULT_LIMITS, LimitExceeded, check_archive
+from pptx_package import DirectoryPackage, ZipPackage, load_xml
 
 NS = {
     'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
@@ -9,126 +14,151 @@ NS = {
     'c': 'http://schemas.openxmlformats.org/drawingml/2006/chart'
 }
 
-def load_xml(file_path):
-    """Load an XML file and return its root element, or None if it fails."""
-    if not os.path.exists(file_path):
-        print(f"Warning: {file_path} not found, skipping.")
-        return None
-    parser = etree.XMLParser(remove_blank_text=True)
-    try:
-        return etree.parse(file_path, parser).getroot()
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}")
-        return None
+logger = logging.getLogger(__name__)
+
+@timed("open_package")
+def open_package(pptx_path, extract=False, limits=DEFAULT_LIMITS):
+    """Open a deck and return a package handle, or None if it cannot be read.
 
-def pptx_to_xml(pptx_path, output_xml_file):
-    # Extract base name from pptx_path (e.g., "test diyea 3")
-    base_name = os.path.splitext(os.path.basename(pptx_path))[0]
-    # Define extraction directory as /parser/temp_pptx/{base_name}
-    extract_dir = os.path.join(os.path.dirname(__file__), "temp_pptx", base_name)
-    
-    # Ensure extraction directory exists
-    os.makedirs(extract_dir, exist_ok=True)
-    
-    # Extract PPTX contents to extract_dir
+    By default parts are streamed straight out of the archive (a ZipPackage).
+    Pass extract=True to keep the old behaviour of unpacking the deck into
+    parser/temp_pptx/{base_name}. Either way the archive is first checked
+    against `limits` (see limits.Limits) from its central directory, and a
+    deck over them is rejected like an unreadable one.
+    """
     try:
-        with zipfile.ZipFile(pptx_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-        print(f"Extracted PPTX contents to {extract_dir}")
+        if extract:
+            # Extract base name from pptx_path (e.g., "test diyea 3")
+            base_name = os.path.splitext(os.path.basename(pptx_path))[0]
+            # Define extraction directory as /parser/temp_pptx/{base_name}
+            extract_dir = os.path.join(os.path.dirname(__file__), "temp_pptx", base_name)
+            with zipfile.ZipFile(pptx_path, 'r') as zip_ref:
+                check_archive(zip_ref, limits)
+                os.makedirs(extract_dir, exist_ok=True)
+                zip_ref.extractall(extract_dir)
+                increment("bytes_copied", sum(info.file_size for info in zip_ref.infolist()))
+            logger.info("Extracted PPTX contents to %s", extract_dir)
+            package = DirectoryPackage(extract_dir)
+        else:
+            package = ZipPackage(pptx_path)
+            try:
+                check_archive(package.zip, limits)
+            except Exception:
+                package.close()
+                raise
+    except LimitExceeded as e:
+        logger.error("Rejected %s: %s", pptx_path, e)
+        return None
     except Exception as e:
-        print(f"Error unzipping {pptx_path}: {e}")
+        logger.error("Error unzipping %s: %s", pptx_path, e)
         return None  # Return None on failure
+    return package
+
+@timed("build_xml")
+def build_pptx_xml(package, skip_parts=(), include_slides=True):
+    """Combine the presentation, masters, themes, layouts, slides and slide rels into one tree.
 
+    Master, theme, layout and slide parts named in `skip_parts` (e.g. ones
+    already in the parse cache) are left out and never read. With
+    include_slides=False the slides and their rels are left out too, so the
+    tree only holds the template and slides can be loaded one at a time.
+    """
     # Create the root element for the custom XML
     root = etree.Element("pptx")
 
     # 1. Load presentation.xml
-    pres_path = os.path.join(extract_dir, "ppt", "presentation.xml")
-    pres_xml = load_xml(pres_path)
+    pres_xml = package.load_xml("ppt/presentation.xml")
     if pres_xml is not None:
         presentation_elem = etree.SubElement(root, "presentation")
         presentation_elem.append(pres_xml)
-        slide_ids = [(sld.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'), 
-                      sld.get('id')) 
-                     for sld in pres_xml.findall('.//p:sldIdLst/p:sldId', NS)]
     else:
-        slide_ids = []
-        print("Warning: No presentation.xml found.")
+        logger.warning("No presentation.xml found.")
 
     # 2. Load all slide masters
-    master_dir = os.path.join(extract_dir, "ppt", "slideMasters")
-    if os.path.exists(master_dir):
-        master_files = sorted([f for f in os.listdir(master_dir) if f.endswith(".xml")])
+    master_files = package.list_parts("ppt/slideMasters", ".xml")
+    if master_files is not None:
         masters_elem = etree.SubElement(root, "slideMasters")
         for master_file in master_files:
-            master_path = os.path.join(master_dir, master_file)
-            master_xml = load_xml(master_path)
+            part_name = f"ppt/slideMasters/{master_file}"
+            if part_name in skip_parts:
+                continue
+            master_xml = package.load_xml(part_name)
             if master_xml is not None:
-                master_elem = etree.SubElement(masters_elem, "slideMaster", file=master_file)
+                master_elem = etree.SubElement(masters_elem, "slideMaster", file=master_file, part=part_name)
                 master_elem.append(master_xml)
 
     # 3. Load all themes
-    theme_dir = os.path.join(extract_dir, "ppt", "theme")
-    if os.path.exists(theme_dir):
-        theme_files = sorted([f for f in os.listdir(theme_dir) if f.endswith(".xml")])
+    theme_files = package.list_parts("ppt/theme", ".xml")
+    if theme_files is not None:
         themes_elem = etree.SubElement(root, "themes")
         for theme_file in theme_files:
-            theme_path = os.path.join(theme_dir, theme_file)
-            theme_xml = load_xml(theme_path)
+            part_name = f"ppt/theme/{theme_file}"
+            if part_name in skip_parts:
+                continue
+            theme_xml = package.load_xml(part_name)
             if theme_xml is not None:
-                theme_elem = etree.SubElement(themes_elem, "theme", file=theme_file)
+                theme_elem = etree.SubElement(themes_elem, "theme", file=theme_file, part=part_name)
                 theme_elem.append(theme_xml)
 
     # 4. Load all slide layouts
-    layout_dir = os.path.join(extract_dir, "ppt", "slideLayouts")
-    if os.path.exists(layout_dir):
-        layout_files = sorted([f for f in os.listdir(layout_dir) if f.endswith(".xml")])
+    layout_files = package.list_parts("ppt/slideLayouts", ".xml")
+    if layout_files is not None:
         layouts_elem = etree.SubElement(root, "slideLayouts")
         for layout_file in layout_files:
-            layout_path = os.path.join(layout_dir, layout_file)
-            layout_xml = load_xml(layout_path)
+            part_name = f"ppt/slideLayouts/{layout_file}"
+            if part_name in skip_parts:
+                continue
+            layout_xml = package.load_xml(part_name)
             if layout_xml is not None:
-                layout_elem = etree.SubElement(layouts_elem, "slideLayout", file=layout_file)
+                layout_elem = etree.SubElement(layouts_elem, "slideLayout", file=layout_file, part=part_name)
                 layout_elem.append(layout_xml)
 
-    # 5. Load all slides with relationships
-    slide_dir = os.path.join(extract_dir, "ppt", "slides")
-    if os.path.exists(slide_dir):
-        slide_files = sorted([f for f in os.listdir(slide_dir) if f.endswith(".xml")])
+    # 5. Load all slides in presentation (sldIdLst) order, then any slide parts it does not list
+    index = package.index
+    slide_files = package.list_parts("ppt/slides", ".xml")
+    if slide_files is not None and include_slides:
         slides_elem = etree.SubElement(root, "slides")
-        for slide_file in slide_files:
-            slide_path = os.path.join(slide_dir, slide_file)
-            slide_xml = load_xml(slide_path)
+        slide_entries = list(index.slides)
+        slide_entries += [(f"ppt/slides/{slide_file}", None, None) for slide_file in slide_files
+                          if f"ppt/slides/{slide_file}" not in index.slide_numbers]
+        for part_name, r_id, sld_id in slide_entries:
+            if part_name in skip_parts:
+                continue
+            slide_xml = package.load_xml(part_name)
             if slide_xml is not None:
-                slide_elem = etree.SubElement(slides_elem, "slide", file=slide_file)
-                slide_idx = slide_files.index(slide_file)
-                if slide_idx < len(slide_ids):
-                    r_id, sld_id = slide_ids[slide_idx]
+                slide_elem = etree.SubElement(slides_elem, "slide", file=posixpath.basename(part_name),
+                                              part=part_name)
+                if r_id is not None:
                     slide_elem.set("rId", r_id)
                     slide_elem.set("sldId", sld_id or f"unknown_{r_id}")
                 slide_elem.append(slide_xml)
 
     # 6. Include slide-specific relationships
-    slide_rels_dir = os.path.join(extract_dir, "ppt", "slides", "_rels")
-    if os.path.exists(slide_rels_dir):
-        slide_rels_files = sorted([f for f in os.listdir(slide_rels_dir) if f.endswith(".rels")])
+    slide_rels_files = package.list_parts("ppt/slides/_rels", ".rels")
+    if slide_rels_files is not None and include_slides:
         rels_elem = etree.SubElement(root, "relationships")
         for rels_file in slide_rels_files:
-            rels_path = os.path.join(slide_rels_dir, rels_file)
-            rels_xml = load_xml(rels_path)
+            rels_xml = package.load_xml(f"ppt/slides/_rels/{rels_file}")
             if rels_xml is not None:
                 rel_elem = etree.SubElement(rels_elem, "relationship", file=rels_file)
                 rel_elem.append(rels_xml)
 
-    # Save the combined XML
+    logger.info("Components included: Slides=%d, Layouts=%d, Masters=%d, Themes=%d",
+                len(slide_files or []), len(layout_files or []), len(master_files or []), len(theme_files or []))
+    return root
+
+def write_pptx_xml(root, output_xml_file):
+    """Save the combined XML, e.g. as a debug artefact next to the JSON output."""
     tree = etree.ElementTree(root)
-    with open(output_xml_file, 'wb') as f:
+    with stage("write_xml"), open(output_xml_file, 'wb') as f:
         tree.write(f, pretty_print=True, xml_declaration=True, encoding='UTF-8')
-    print(f"Combined PPTX XML saved to {output_xml_file}")
-    print(f"Components included: "
-          f"Slides={len(slide_files if 'slide_files' in locals() else [])}, "
-          f"Layouts={len(layout_files if 'layout_files' in locals() else [])}, "
-          f"Masters={len(master_files if 'master_files' in locals() else [])}, "
-          f"Themes={len(theme_files if 'theme_files' in locals() else [])}")
-    
-    return extract_dir  # Return the extraction directory for reuse
\ No newline at end of file
+    increment("bytes_written", os.path.getsize(output_xml_file))
+    logger.info("Combined PPTX XML saved to %s", output_xml_file)
+
+def pptx_to_xml(pptx_path, output_xml_file, extract=False):
+    """Build the combined XML for a deck, save it and return the package its parts came from."""
+    package = open_package(pptx_path, extract=extract)
+    if package is None:
+        return None
+    write_pptx_xml(build_pptx_xml(package), output_xml_file)
+    return package  # Return the package handle for reuse
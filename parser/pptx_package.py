@@ -0,0 +1,277 @@
+import logging
+import os
+import posixpath
+import shutil
+import zipfile
+from lxml import etree
+from instrumentation import increment, stage
+
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+DOC_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+P_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+
+PRESENTATION_PART = "ppt/presentation.xml"
+
+logger = logging.getLogger(__name__)
+
+
+def load_xml(file_path):
+    """Load an XML file and return its root element, or None if it fails."""
+    if not os.path.exists(file_path):
+        logger.warning("%s not found, skipping.", file_path)
+        return None
+    parser = etree.XMLParser(remove_blank_text=True)
+    try:
+        with stage("load_xml"):
+            root = etree.parse(file_path, parser).getroot()
+        increment("parts_loaded")
+        increment("bytes_read", os.path.getsize(file_path))
+        return root
+    except Exception as e:
+        logger.error("Error loading %s: %s", file_path, e)
+        return None
+
+
+class DirectoryPackage:
+    """PPTX parts read from a directory the archive was extracted into.
+
+    Part names that resolve outside root_dir (through '..' or a symlink)
+    raise ValueError, and has_part() reports them as missing, so a crafted
+    deck cannot make the parser read files from the host.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.source = root_dir
+        self._real_root = os.path.realpath(root_dir)
+        self._index = None
+
+    def _path(self, part_name):
+        path = os.path.join(self.root_dir, *part_name.split('/'))
+        real = os.path.realpath(path)
+        if real != self._real_root and os.path.commonpath([real, self._real_root]) != self._real_root:
+            raise ValueError(f"part {part_name} is outside the package")
+        return path
+
+    def has_part(self, part_name):
+        try:
+            return os.path.isfile(self._path(part_name))
+        except ValueError:
+            return False
+
+    def list_parts(self, folder, suffix):
+        """Return the sorted file names directly inside `folder` ending with `suffix`."""
+        try:
+            path = self._path(folder)
+        except ValueError:
+            return None
+        if not os.path.isdir(path):
+            return None
+        return sorted(f for f in os.listdir(path) if f.endswith(suffix))
+
+    def read_part(self, part_name):
+        with open(self._path(part_name), 'rb') as f:
+            data = f.read()
+        increment("bytes_read", len(data))
+        return data
+
+    def open_part(self, part_name):
+        return open(self._path(part_name), 'rb')
+
+    def part_size(self, part_name):
+        return os.path.getsize(self._path(part_name))
+
+    def fingerprint(self, part_name):
+        """Cheap change detector for a part (size and mtime), or None if it is missing."""
+        try:
+            st = os.stat(self._path(part_name))
+        except (OSError, ValueError):
+            return None
+        return f"{st.st_size}:{st.st_mtime_ns}"
+
+    def load_xml(self, part_name):
+        """Load an XML part and return its root element, or None if it fails."""
+        try:
+            path = self._path(part_name)
+        except ValueError as e:
+            logger.error("Error loading %s: %s", part_name, e)
+            return None
+        return load_xml(path)
+
+    def copy_part(self, part_name, output_path):
+        shutil.copy(self._path(part_name), output_path)
+        increment("bytes_copied", os.path.getsize(output_path))
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = PackageIndex(self)
+        return self._index
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ZipPackage:
+    """PPTX parts streamed straight from the open archive, nothing written to disk."""
+
+    def __init__(self, pptx_path):
+        self.pptx_path = pptx_path
+        self.source = pptx_path
+        self.zip = zipfile.ZipFile(pptx_path, 'r')
+        self.names = set(self.zip.namelist())
+        self._index = None
+
+    def has_part(self, part_name):
+        return part_name in self.names
+
+    def list_parts(self, folder, suffix):
+        """Return the sorted file names directly inside `folder` ending with `suffix`."""
+        prefix = folder.rstrip('/') + '/'
+        found = [name[len(prefix):] for name in self.names
+                 if name.startswith(prefix) and '/' not in name[len(prefix):]]
+        if not found:
+            return None
+        return sorted(f for f in found if f.endswith(suffix))
+
+    def read_part(self, part_name):
+        data = self.zip.read(part_name)
+        increment("bytes_read", len(data))
+        return data
+
+    def open_part(self, part_name):
+        return self.zip.open(part_name)
+
+    def part_size(self, part_name):
+        """Uncompressed size declared by the central directory."""
+        return self.zip.getinfo(part_name).file_size
+
+    def fingerprint(self, part_name):
+        """Change detector for a part from the central directory (CRC-32 and size), or None if it is missing."""
+        if part_name not in self.names:
+            return None
+        info = self.zip.getinfo(part_name)
+        return f"{info.CRC:08x}:{info.file_size}"
+
+    def load_xml(self, part_name):
+        """Load an XML part and return its root element, or None if it fails."""
+        if part_name not in self.names:
+            logger.warning("%s not found in %s, skipping.", part_name, self.pptx_path)
+            return None
+        parser = etree.XMLParser(remove_blank_text=True)
+        try:
+            with stage("load_xml"), self.zip.open(part_name) as f:
+                root = etree.parse(f, parser).getroot()
+            increment("parts_loaded")
+            increment("bytes_read", self.zip.getinfo(part_name).file_size)
+            return root
+        except Exception as e:
+            logger.error("Error loading %s from %s: %s", part_name, self.pptx_path, e)
+            return None
+
+    def copy_part(self, part_name, output_path):
+        with self.zip.open(part_name) as src, open(output_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        increment("bytes_copied", self.zip.getinfo(part_name).file_size)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = PackageIndex(self)
+        return self._index
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def rels_part_for(part_name):
+    """ppt/slides/slide1.xml -> ppt/slides/_rels/slide1.xml.rels"""
+    folder, name = posixpath.split(part_name)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+def resolve_target(part_name, target):
+    """Resolve a relationship Target against the part that owns it to a package part name.
+
+    A target that climbs out of the package resolves to a name starting
+    with '..'; PackageIndex drops those.
+    """
+    if target.startswith('/'):
+        return posixpath.normpath(target.lstrip('/'))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part_name), target))
+
+
+class PackageIndex:
+    """Relationship index for one deck, built once and queried in O(1).
+
+    Maps each part to its relationships (rId -> type, target part), and the
+    presentation's sldIdLst to slide parts in presentation order. Rels files
+    are read the first time a part's relationships are asked for.
+    """
+
+    def __init__(self, package):
+        self.package = package
+        self._rels = {}
+        self.slides = []  # (part_name, rId, sldId) in sldIdLst order
+        self.slide_numbers = {}  # part_name -> position in presentation order
+
+        pres_xml = package.load_xml(PRESENTATION_PART) if package.has_part(PRESENTATION_PART) else None
+        if pres_xml is None:
+            return
+        pres_rels = self.relationships(PRESENTATION_PART)
+        for sld in pres_xml.iterfind(f'{{{P_NS}}}sldIdLst/{{{P_NS}}}sldId'):
+            r_id = sld.get(f'{{{DOC_REL_NS}}}id')
+            rel = pres_rels.get(r_id)
+            if rel is None or rel["target"] is None:
+                logger.warning("slide %s has no relationship in presentation.xml.rels, skipping.", r_id)
+                continue
+            self.slide_numbers[rel["target"]] = len(self.slides)
+            self.slides.append((rel["target"], r_id, sld.get('id')))
+
+    def relationships(self, part_name):
+        """Return {rId: {"type", "target", "target_mode"}} for a part ({} if it has no rels)."""
+        rels = self._rels.get(part_name)
+        if rels is None:
+            rels = {}
+            rels_part = rels_part_for(part_name)
+            rels_xml = self.package.load_xml(rels_part) if self.package.has_part(rels_part) else None
+            if rels_xml is not None:
+                for rel in rels_xml.iterfind(f'{{{PKG_REL_NS}}}Relationship'):
+                    target = rel.get('Target', '')
+                    external = rel.get('TargetMode') == 'External'
+                    if not external:
+                        target = resolve_target(part_name, target)
+                        if target.split('/', 1)[0] == '..':
+                            logger.warning("Relationship %s of %s points outside the package, skipping.",
+                                           rel.get('Id'), part_name)
+                            continue
+                    rels[rel.get('Id')] = {
+                        "type": rel.get('Type', '').rsplit('/', 1)[-1],
+                        "target": target,
+                        "target_mode": 'External' if external else 'Internal',
+                    }
+            self._rels[part_name] = rels
+        return rels
+
+    def resolve(self, part_name, r_id):
+        """Return the part name a relationship of `part_name` points at, or None."""
+        rel = self.relationships(part_name).get(r_id)
+        if rel is None or rel["target_mode"] == 'External':
+            return None
+        return rel["target"]
+
+    def related(self, part_name, rel_type):
+        """Return the target parts of `part_name`'s relationships of a given type (e.g. "slideLayout")."""
+        return [rel["target"] for rel in self.relationships(part_name).values()
+                if rel["type"] == rel_type and rel["target_mode"] != 'External']
@@ -0,0 +1,135 @@
+from collections.abc import Sequence
+from media_store import MediaStore
+from ppt_to_xml import open_package
+from xml_to_json import (first_related, load_slide, parse_theme, part_id, resolve_layout, resolve_master,
+                         slide_record, template_parts)
+
+
+class LazySlides(Sequence):
+    """deck.slides: slide records parsed on first access and memoized."""
+
+    def __init__(self, presentation):
+        self._presentation = presentation
+        self._parsed = {}
+
+    def __len__(self):
+        return len(self._presentation.package.index.slides)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("slide index out of range")
+        if i not in self._parsed:
+            self._parsed[i] = self._presentation._parse_slide(i)
+        return self._parsed[i]
+
+    @property
+    def parsed_count(self):
+        return len(self._parsed)
+
+
+class Presentation:
+    """A deck opened for on-demand queries instead of a full conversion.
+
+    Opening reads only the zip central directory, presentation.xml and its
+    rels, so slide_count and slide_parts cost no slide parsing. A slide is
+    parsed (with its layout, master and theme) the first time deck.slides[i]
+    is read, and every part is parsed at most once. Records have the same
+    shape as iter_pptx_records output, including the error record of a slide
+    that is missing or malformed. Media is only hashed and referenced
+    by archive member unless a MediaStore with a directory is passed.
+
+        with Presentation("deck.pptx") as deck:
+            print(deck.slide_count, deck.title(0))
+    """
+
+    def __init__(self, pptx_path, media_store=None, extract=False):
+        self.package = open_package(pptx_path, extract=extract)
+        if self.package is None:
+            raise ValueError(f"Cannot open {pptx_path}")
+        self.media_store = media_store if media_store is not None else MediaStore(None)
+        self.slides = LazySlides(self)
+        self._masters = {}
+        self._layouts = {}
+        self._themes = {}
+
+    @property
+    def slide_count(self):
+        return len(self.package.index.slides)
+
+    @property
+    def slide_parts(self):
+        """Slide part names in presentation order."""
+        return [part_name for part_name, _, _ in self.package.index.slides]
+
+    def master(self, part_name):
+        """Resolved master record for a master part, or None if it is missing."""
+        if part_name not in self._masters:
+            master_elem = self.package.load_xml(part_name) if part_name and self.package.has_part(part_name) else None
+            self._masters[part_name] = (resolve_master(master_elem, part_name, self.package, self.media_store)
+                                        if master_elem is not None else None)
+        return self._masters[part_name]
+
+    def layout(self, part_name):
+        """Resolved layout record (with its master's inheritance applied), or None if it is missing."""
+        if part_name not in self._layouts:
+            layout_elem = self.package.load_xml(part_name) if part_name and self.package.has_part(part_name) else None
+            layout = None
+            if layout_elem is not None:
+                master = self.master(first_related(self.package.index, part_name, "slideMaster"))
+                layout = resolve_layout(layout_elem, part_name, master, self.package, self.media_store)
+            self._layouts[part_name] = layout
+        return self._layouts[part_name]
+
+    def theme(self, part_name):
+        """{"id", "colors"} for a theme part, or None if it is missing."""
+        if part_name not in self._themes:
+            theme_elem = self.package.load_xml(part_name) if part_name and self.package.has_part(part_name) else None
+            self._themes[part_name] = ({"id": part_id(part_name), **parse_theme(theme_elem)}
+                                       if theme_elem is not None else None)
+        return self._themes[part_name]
+
+    @property
+    def layouts(self):
+        """Every layout in the deck, resolved on first access."""
+        return [layout for layout in map(self.layout, template_parts(self.package, "ppt/slideLayouts")) if layout]
+
+    @property
+    def colors(self):
+        """Theme colors of the first master, as in the converted output's template."""
+        masters = template_parts(self.package, "ppt/slideMasters")
+        if not masters:
+            return {}
+        theme = self.theme(first_related(self.package.index, masters[0], "theme"))
+        return theme["colors"] if theme else {}
+
+    def _parse_slide(self, i):
+        part_name = self.package.index.slides[i][0]
+        layout = self.layout(first_related(self.package.index, part_name, "slideLayout"))
+        slide_data = load_slide(self.package, part_name, self.package.index.relationships(part_name),
+                                self.media_store, layout)
+        return slide_record(i, part_name, layout, slide_data)
+
+    def text(self, i):
+        """Paragraph texts of slide i, in element order."""
+        return [run["text"] for element in self.slides[i]["elements"] if element["type"] == "text"
+                for run in element["content"]]
+
+    def title(self, i):
+        """Text of slide i's title placeholder, or None if it has none."""
+        for element in self.slides[i]["elements"]:
+            if element["type"] == "text" and element["is_header"]:
+                return " ".join(run["text"] for run in element["content"])
+        return None
+
+    def close(self):
+        self.package.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,313 @@
+import argparse
+import random
+import struct
+import zipfile
+import zlib
+from lxml import etree
+
+P_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+C_NS = 'http://schemas.openxmlformats.org/drawingml/2006/chart'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+CT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+CT_PML = 'application/vnd.openxmlformats-officedocument.presentationml.'
+
+NSMAP = {'p': P_NS, 'a': A_NS, 'r': R_NS}
+
+# Defaults for generate_deck; the benchmark presets override some of them
+DECK_DEFAULTS = {
+    "slides": 10,
+    "shapes_per_slide": 6,
+    "paragraphs_per_shape": 2,
+    "table_rows": 0,
+    "table_cols": 0,
+    "images_per_slide": 1,
+    "image_parts": 4,
+    "duplicate_image_parts": 2,
+    "image_bytes": 16 * 1024,
+    "charts_per_slide": 0,
+    "masters": 1,
+    "layouts_per_master": 2,
+    "seed": 0,
+}
+
+WORDS = ("revenue growth quarter market customer product launch team roadmap pipeline "
+         "margin forecast strategy platform region partner target cost churn retention").split()
+
+
+def p(tag):
+    return f'{{{P_NS}}}{tag}'
+
+def a(tag):
+    return f'{{{A_NS}}}{tag}'
+
+def part_bytes(root):
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+def fake_png(rng, size):
+    """A valid grayscale PNG whose compressed pixel data is roughly `size` bytes of noise."""
+    width = max(1, int(size ** 0.5))
+    height = max(1, size // width)
+    raw = b''.join(b'\x00' + rng.randbytes(width) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 1))
+            + chunk(b'IEND', b''))
+
+def relationships(rels):
+    """rels: list of (rId, type, target) -> a .rels part."""
+    root = etree.Element(f'{{{PKG_REL_NS}}}Relationships', nsmap={None: PKG_REL_NS})
+    for r_id, rel_type, target in rels:
+        etree.SubElement(root, f'{{{PKG_REL_NS}}}Relationship', Id=r_id, Type=REL_TYPE + rel_type, Target=target)
+    return part_bytes(root)
+
+def add_xfrm(parent, rng, tag=None):
+    xfrm = etree.SubElement(parent, tag or a('xfrm'))
+    etree.SubElement(xfrm, a('off'), x=str(rng.randrange(0, 9000000)), y=str(rng.randrange(0, 5000000)))
+    etree.SubElement(xfrm, a('ext'), cx=str(rng.randrange(100000, 4000000)), cy=str(rng.randrange(100000, 2000000)))
+    return xfrm
+
+def add_nv(parent, kind, shape_id, ph_type=None, ph_idx=None):
+    nv = etree.SubElement(parent, p(f'nv{kind}Pr'))
+    etree.SubElement(nv, p('cNvPr'), id=str(shape_id), name=f'{kind} {shape_id}')
+    etree.SubElement(nv, p(f'cNv{kind}Pr'))
+    nv_pr = etree.SubElement(nv, p('nvPr'))
+    if ph_type is not None or ph_idx is not None:
+        ph = etree.SubElement(nv_pr, p('ph'))
+        if ph_type is not None:
+            ph.set('type', ph_type)
+        if ph_idx is not None:
+            ph.set('idx', str(ph_idx))
+
+def add_text_body(parent, rng, paragraphs, tag=None):
+    tx_body = etree.SubElement(parent, tag or p('txBody'))
+    etree.SubElement(tx_body, a('bodyPr'))
+    for _ in range(paragraphs):
+        para = etree.SubElement(tx_body, a('p'))
+        for _ in range(rng.randint(1, 3)):
+            run = etree.SubElement(para, a('r'))
+            r_pr = etree.SubElement(run, a('rPr'), sz=str(rng.choice((1200, 1800, 2400, 3200))),
+                                    b=rng.choice(('0', '1')))
+            fill = etree.SubElement(r_pr, a('solidFill'))
+            etree.SubElement(fill, a('srgbClr'), val=f'{rng.randrange(0x1000000):06X}')
+            etree.SubElement(r_pr, a('latin'), typeface=rng.choice(('Calibri', 'Arial', 'Georgia')))
+            etree.SubElement(run, a('t')).text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+    return tx_body
+
+def add_shape(sp_tree, rng, shape_id, paragraphs, ph_type=None, ph_idx=None, positioned=True):
+    sp = etree.SubElement(sp_tree, p('sp'))
+    add_nv(sp, 'Sp', shape_id, ph_type, ph_idx)
+    sp_pr = etree.SubElement(sp, p('spPr'))
+    if positioned:
+        add_xfrm(sp_pr, rng)
+    if ph_type is None and ph_idx is None:
+        etree.SubElement(sp_pr, a('prstGeom'), prst=rng.choice(('rect', 'roundRect', 'ellipse')))
+        fill = etree.SubElement(sp_pr, a('solidFill'))
+        etree.SubElement(fill, a('schemeClr' if rng.random() < 0.5 else 'srgbClr'),
+                         val=rng.choice(('accent1', 'accent2')) if rng.random() < 0.5 else f'{rng.randrange(0x1000000):06X}')
+        ln = etree.SubElement(sp_pr, a('ln'), w='12700')
+        etree.SubElement(etree.SubElement(ln, a('solidFill')), a('srgbClr'), val='404040')
+    if paragraphs:
+        add_text_body(sp, rng, paragraphs)
+    return sp
+
+def add_picture(sp_tree, rng, shape_id, r_id):
+    pic = etree.SubElement(sp_tree, p('pic'))
+    add_nv(pic, 'Pic', shape_id)
+    blip_fill = etree.SubElement(pic, p('blipFill'))
+    etree.SubElement(blip_fill, a('blip'), {f'{{{R_NS}}}embed': r_id})
+    add_xfrm(etree.SubElement(pic, p('spPr')), rng)
+
+def add_graphic_frame(sp_tree, rng, shape_id):
+    frame = etree.SubElement(sp_tree, p('graphicFrame'))
+    add_nv(frame, 'GraphicFrame', shape_id)
+    add_xfrm(frame, rng, tag=p('xfrm'))
+    return etree.SubElement(etree.SubElement(frame, a('graphic')), a('graphicData'))
+
+def add_table(sp_tree, rng, shape_id, rows, cols):
+    tbl = etree.SubElement(add_graphic_frame(sp_tree, rng, shape_id), a('tbl'))
+    for _ in range(rows):
+        tr = etree.SubElement(tbl, a('tr'))
+        for _ in range(cols):
+            add_text_body(etree.SubElement(tr, a('tc')), rng, 1, tag=a('txBody'))
+
+def add_chart(sp_tree, rng, shape_id, r_id):
+    graphic_data = add_graphic_frame(sp_tree, rng, shape_id)
+    etree.SubElement(graphic_data, f'{{{C_NS}}}chart', {f'{{{R_NS}}}id': r_id}, nsmap={'c': C_NS})
+
+def chart_part(rng, points=12):
+    root = etree.Element(f'{{{C_NS}}}chartSpace', nsmap={'c': C_NS})
+    ser = etree.SubElement(etree.SubElement(etree.SubElement(root, f'{{{C_NS}}}chart'), f'{{{C_NS}}}plotArea'),
+                           f'{{{C_NS}}}ser')
+    for i in range(points):
+        pt = etree.SubElement(ser, f'{{{C_NS}}}pt', idx=str(i))
+        etree.SubElement(pt, f'{{{C_NS}}}v').text = str(rng.randint(0, 1000))
+    return part_bytes(root)
+
+def template_root(tag, name=None):
+    root = etree.Element(p(tag), nsmap=NSMAP)
+    c_sld = etree.SubElement(root, p('cSld'))
+    if name:
+        c_sld.set('name', name)
+    return root, c_sld
+
+def theme_part(rng, index):
+    root = etree.Element(a('theme'), nsmap={'a': A_NS}, name=f'Theme {index}')
+    scheme = etree.SubElement(etree.SubElement(root, a('themeElements')), a('clrScheme'), name=f'Scheme {index}')
+    for name in ('dk1', 'lt1', 'dk2', 'lt2', 'accent1', 'accent2', 'accent3', 'hlink'):
+        etree.SubElement(etree.SubElement(scheme, a(name)), a('srgbClr'), val=f'{rng.randrange(0x1000000):06X}')
+    return part_bytes(root)
+
+def master_part(rng, index):
+    root, c_sld = template_root('sldMaster')
+    bg_pr = etree.SubElement(etree.SubElement(c_sld, p('bg')), p('bgPr'))
+    etree.SubElement(etree.SubElement(bg_pr, a('solidFill')), a('srgbClr'), val=f'{rng.randrange(0x1000000):06X}')
+    sp_tree = etree.SubElement(c_sld, p('spTree'))
+    add_shape(sp_tree, rng, 2, 0, ph_type='title')
+    add_shape(sp_tree, rng, 3, 0, ph_type='body', ph_idx=1)
+    add_shape(sp_tree, rng, 4, 1, ph_type='ftr', ph_idx=11)
+    add_shape(sp_tree, rng, 5, 1, ph_type='sldNum', ph_idx=12)
+    add_shape(sp_tree, rng, 6, 1)  # logo text on every slide
+    return part_bytes(root)
+
+def layout_part(rng, index):
+    root, c_sld = template_root('sldLayout', name=f'Layout {index}')
+    sp_tree = etree.SubElement(c_sld, p('spTree'))
+    add_shape(sp_tree, rng, 2, 0, ph_type='title', positioned=False)
+    add_shape(sp_tree, rng, 3, 0, ph_idx=1, positioned=rng.random() < 0.5)
+    return part_bytes(root)
+
+def slide_part(rng, params, image_rids, chart_rids):
+    root, c_sld = template_root('sld')
+    sp_tree = etree.SubElement(c_sld, p('spTree'))
+    shape_id = 2
+    add_shape(sp_tree, rng, shape_id, 1, ph_type='title', positioned=False)
+    for _ in range(params["shapes_per_slide"]):
+        shape_id += 1
+        add_shape(sp_tree, rng, shape_id, params["paragraphs_per_shape"] if rng.random() < 0.7 else 0)
+    for r_id in image_rids:
+        shape_id += 1
+        add_picture(sp_tree, rng, shape_id, r_id)
+    if params["table_rows"] and params["table_cols"]:
+        shape_id += 1
+        add_table(sp_tree, rng, shape_id, params["table_rows"], params["table_cols"])
+    for r_id in chart_rids:
+        shape_id += 1
+        add_chart(sp_tree, rng, shape_id, r_id)
+    return part_bytes(root)
+
+def content_types(parts):
+    root = etree.Element(f'{{{CT_NS}}}Types', nsmap={None: CT_NS})
+    for ext, content_type in (('rels', 'application/vnd.openxmlformats-package.relationships+xml'),
+                              ('xml', 'application/xml'), ('png', 'image/png')):
+        etree.SubElement(root, f'{{{CT_NS}}}Default', Extension=ext, ContentType=content_type)
+    kinds = {'ppt/slides/': 'slide', 'ppt/slideLayouts/': 'slideLayout', 'ppt/slideMasters/': 'slideMaster'}
+    for part_name in parts:
+        for prefix, kind in kinds.items():
+            if part_name.startswith(prefix) and '/_rels/' not in part_name:
+                etree.SubElement(root, f'{{{CT_NS}}}Override', PartName='/' + part_name,
+                                 ContentType=f'{CT_PML}{kind}+xml')
+    etree.SubElement(root, f'{{{CT_NS}}}Override', PartName='/ppt/presentation.xml',
+                     ContentType=f'{CT_PML}presentation.main+xml')
+    return part_bytes(root)
+
+def generate_deck(path, **params):
+    """Write a synthetic deck to `path` and return the parameters it was built with.
+
+    Every knob in DECK_DEFAULTS can be overridden: slide count, shapes and
+    paragraphs per shape, table size, images per slide spread over
+    `image_parts` media parts (the first `duplicate_image_parts` of which hold
+    identical bytes, to exercise media de-duplication), charts per slide, and
+    masters with their layouts. Output is deterministic for a given seed.
+    """
+    unknown = set(params) - set(DECK_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown deck parameters: {sorted(unknown)}")
+    params = {**DECK_DEFAULTS, **params}
+    rng = random.Random(params["seed"])
+    parts = {}
+
+    # Masters, each with its own theme and layouts
+    layouts = []
+    pres_rels = []
+    master_ids = etree.Element(p('sldMasterIdLst'))
+    for m in range(1, params["masters"] + 1):
+        master = f"ppt/slideMasters/slideMaster{m}.xml"
+        parts[master] = master_part(rng, m)
+        parts[f"ppt/theme/theme{m}.xml"] = theme_part(rng, m)
+        master_rels = [("rIdTheme", "theme", f"../theme/theme{m}.xml")]
+        for _ in range(params["layouts_per_master"]):
+            number = len(layouts) + 1
+            layout = f"ppt/slideLayouts/slideLayout{number}.xml"
+            parts[layout] = layout_part(rng, number)
+            parts[f"ppt/slideLayouts/_rels/slideLayout{number}.xml.rels"] = relationships(
+                [("rId1", "slideMaster", f"../slideMasters/slideMaster{m}.xml")])
+            master_rels.append((f"rId{len(master_rels)}", "slideLayout", f"../slideLayouts/slideLayout{number}.xml"))
+            layouts.append(number)
+        parts[f"ppt/slideMasters/_rels/slideMaster{m}.xml.rels"] = relationships(master_rels)
+        pres_rels.append((f"rIdMaster{m}", "slideMaster", f"slideMasters/slideMaster{m}.xml"))
+        etree.SubElement(master_ids, p('sldMasterId'), {f'{{{R_NS}}}id': f"rIdMaster{m}"}, id=str(2147483648 + m))
+
+    # Media: the first duplicate_image_parts parts share one blob
+    shared_image = fake_png(rng, params["image_bytes"])
+    image_count = params["image_parts"] if params["images_per_slide"] else 0
+    for i in range(1, image_count + 1):
+        parts[f"ppt/media/image{i}.png"] = (shared_image if i <= params["duplicate_image_parts"]
+                                            else fake_png(rng, params["image_bytes"]))
+
+    # Slides, spread round-robin over the layouts
+    slide_ids = etree.Element(p('sldIdLst'))
+    image_slot = 0
+    chart_count = 0
+    for s in range(1, params["slides"] + 1):
+        layout = layouts[(s - 1) % len(layouts)] if layouts else None
+        slide_rels = [("rId1", "slideLayout", f"../slideLayouts/slideLayout{layout}.xml")] if layout else []
+        image_rids = []
+        for _ in range(params["images_per_slide"] if image_count else 0):
+            image_rids.append(f"rId{len(slide_rels) + 1}")
+            slide_rels.append((image_rids[-1], "image", f"../media/image{image_slot % image_count + 1}.png"))
+            image_slot += 1
+        chart_rids = []
+        for _ in range(params["charts_per_slide"]):
+            chart_count += 1
+            parts[f"ppt/charts/chart{chart_count}.xml"] = chart_part(rng)
+            chart_rids.append(f"rId{len(slide_rels) + 1}")
+            slide_rels.append((chart_rids[-1], "chart", f"../charts/chart{chart_count}.xml"))
+        parts[f"ppt/slides/slide{s}.xml"] = slide_part(rng, params, image_rids, chart_rids)
+        parts[f"ppt/slides/_rels/slide{s}.xml.rels"] = relationships(slide_rels)
+        pres_rels.append((f"rId{s}", "slide", f"slides/slide{s}.xml"))
+        etree.SubElement(slide_ids, p('sldId'), {f'{{{R_NS}}}id': f"rId{s}"}, id=str(255 + s))
+
+    presentation = etree.Element(p('presentation'), nsmap=NSMAP)
+    presentation.append(master_ids)
+    presentation.append(slide_ids)
+    etree.SubElement(presentation, p('sldSz'), cx='12192000', cy='6858000')
+    parts["ppt/presentation.xml"] = part_bytes(presentation)
+    parts["ppt/_rels/presentation.xml.rels"] = relationships(pres_rels)
+    parts["_rels/.rels"] = relationships([("rId1", "officeDocument", "ppt/presentation.xml")])
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", content_types(parts))
+        for part_name, data in parts.items():
+            # Media is stored, as PowerPoint does; XML is deflated
+            compress = zipfile.ZIP_STORED if part_name.startswith("ppt/media/") else zipfile.ZIP_DEFLATED
+            zf.writestr(part_name, data, compress_type=compress)
+    return params
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Write a synthetic PPTX deck for benchmarking.")
+    arg_parser.add_argument("output", help="path of the .pptx to write")
+    for name, default in DECK_DEFAULTS.items():
+        arg_parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    args = arg_parser.parse_args(argv)
+    params = generate_deck(args.output, **{name: getattr(args, name) for name in DECK_DEFAULTS})
+    print(f"Wrote {args.output}: {params}")
+
+if __name__ == "__main__":
+    main()
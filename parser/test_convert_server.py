@@ -0,0 +1,116 @@
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import convert_server
+from convert_server import ConversionService, ConvertServer
+from synthetic_deck import generate_deck
+
+MAX_UPLOAD = 1 << 20
+
+real_convert = convert_server.convert
+
+
+def slow_convert(pptx_path, **options):
+    """Stands in for xml_to_json.convert in the (forked) workers: stalls on decks named slow*."""
+    if os.path.basename(pptx_path).startswith("slow"):
+        time.sleep(3)
+    return real_convert(pptx_path, **options)
+
+
+@pytest.fixture
+def decks(tmp_path):
+    for name in ("deck", "slow"):
+        generate_deck(str(tmp_path / f"{name}.pptx"), slides=2)
+    return tmp_path
+
+@pytest.fixture
+def server(decks, tmp_path, monkeypatch):
+    """One worker, no queue and a 0.5s timeout; workers fork after convert is patched, so they inherit it."""
+    monkeypatch.setattr(convert_server, "convert", slow_convert)
+    monkeypatch.setattr(convert_server, "TIMEOUT_GRACE", 0.5)
+    service = ConversionService(workers=1, queue_size=0, timeout=0.5, work_dir=str(tmp_path / "work"),
+                                allowed_roots=[str(decks)])
+    server = ConvertServer(("127.0.0.1", 0), service, MAX_UPLOAD)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def request(server, headers, body=b""):
+    """POST /convert over a fresh connection; returns (status, parsed JSON body)."""
+    with socket.create_connection(server.server_address, timeout=30) as sock:
+        head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        sock.sendall(f"POST /convert HTTP/1.1\r\nHost: test\r\nConnection: close\r\n{head}\r\n".encode() + body)
+        response = b""
+        while chunk := sock.recv(1 << 16):
+            response += chunk
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+def convert_path(server, path):
+    body = json.dumps({"path": str(path)}).encode()
+    return request(server, {"Content-Type": "application/json", "Content-Length": len(body)}, body)
+
+def wait_for_empty(directory, timeout=5):
+    deadline = time.monotonic() + timeout
+    while os.listdir(directory) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return os.listdir(directory)
+
+
+def test_upload_converts(server, decks):
+    body = (decks / "deck.pptx").read_bytes()
+    status, output = request(server, {"Content-Length": len(body)}, body)
+    assert status == 200
+    assert len(output["slides"]) == 2
+    assert server.service.stats()["converted"] == 1
+
+@pytest.mark.parametrize("length, status", [(None, 411), ("-1", 400), ("abc", 400), (str(MAX_UPLOAD + 1), 413)])
+def test_content_length_checked(server, length, status):
+    headers = {} if length is None else {"Content-Length": length}
+    assert request(server, headers)[0] == status
+    assert server.service.stats()["accepted"] == 0
+
+@pytest.mark.parametrize("body", [b'{"path": 5}', b'{"path": null}', b'[]', b'{nope'])
+def test_bad_path_body(server, body):
+    assert request(server, {"Content-Type": "application/json", "Content-Length": len(body)}, body)[0] == 400
+
+def test_path_outside_allowed_roots(server, decks):
+    assert convert_path(server, "/etc/hostname")[0] == 403
+    assert convert_path(server, decks / ".." / "deck.pptx")[0] == 403
+    assert convert_path(server, decks / "missing.pptx")[0] == 404
+
+def test_full_service_rejects_before_reading_body(server, decks):
+    slow = threading.Thread(target=convert_path, args=(server, decks / "slow.pptx"))
+    slow.start()
+    while server.service.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+    # The declared body is never sent: a 503 must come back without waiting for it
+    status, error = request(server, {"Content-Length": MAX_UPLOAD})
+    slow.join()
+    assert status == 503 and error == {"error": "server busy"}
+    assert server.service.stats()["rejected"] == 1
+    assert convert_path(server, decks / "deck.pptx")[0] == 200
+
+def test_worker_timeout(server, decks):
+    status, error = convert_path(server, decks / "slow.pptx")
+    assert status == 504
+    assert "exceeded 0.5s" in error["error"]
+    # The worker stopped at its own timeout and is free again
+    assert convert_path(server, decks / "deck.pptx")[0] == 200
+    assert server.service.stats()["timeout"] == 1
+
+def test_request_directories_removed(server, decks):
+    body = (decks / "deck.pptx").read_bytes()
+    assert request(server, {"Content-Length": len(body)}, body)[0] == 200
+    assert convert_path(server, decks / "slow.pptx")[0] == 504
+    assert request(server, {"Content-Type": "application/json", "Content-Length": 2}, b"{}")[0] == 400
+    assert wait_for_empty(server.service.work_dir) == []
@@ -0,0 +1,54 @@
+import zipfile
+
+import pytest
+
+from limits import LimitExceeded, Limits, check_archive
+from media_store import MediaStore
+from parse_cache import ParseCache
+from synthetic_deck import generate_deck
+from xml_to_json import convert
+
+
+@pytest.fixture
+def deck(tmp_path):
+    path = tmp_path / "deck.pptx"
+    generate_deck(str(path), slides=5, table_rows=10, table_cols=10, image_bytes=256 * 1024)
+    return str(path)
+
+def convert_with(deck, limits, **options):
+    return convert(deck, media_store=MediaStore(None), limits=limits, **options)
+
+def declared_sizes(deck):
+    with zipfile.ZipFile(deck) as z:
+        return {info.filename: info.file_size for info in z.infolist()}
+
+
+@pytest.mark.parametrize("limits, message", [
+    (Limits(max_total_bytes=100_000), "archive is"),
+    (Limits(max_part_bytes=1_000), r"part \S+ is \d+ bytes uncompressed"),
+    (Limits(max_slides=4), "deck has 5 slides"),
+])
+def test_archive_over_limits_is_rejected(deck, limits, message):
+    with zipfile.ZipFile(deck) as z, pytest.raises(LimitExceeded, match=message):
+        check_archive(z, limits)
+    assert convert_with(deck, limits) is None
+
+def test_archive_within_limits(deck):
+    sizes = declared_sizes(deck)
+    xml_max = max(size for name, size in sizes.items() if name.endswith((".xml", ".rels")))
+    # Media only counts towards the total, so a part limit below the image size still passes
+    limits = Limits(max_total_bytes=sum(sizes.values()), max_part_bytes=xml_max, max_slides=5)
+    assert max(sizes.values()) > xml_max
+    assert len(convert_with(deck, limits)["slides"]) == 5
+
+def test_table_over_cell_limit_raises(deck):
+    assert convert_with(deck, Limits(max_table_cells=100))
+    with pytest.raises(LimitExceeded, match="more than 99 cells"):
+        convert_with(deck, Limits(max_table_cells=99))
+
+def test_stricter_cell_limit_misses_cache(deck, tmp_path):
+    with ParseCache(str(tmp_path / "cache.db")) as cache:
+        assert convert_with(deck, Limits(), cache=cache)
+        assert convert_with(deck, Limits(), cache=cache)
+        with pytest.raises(LimitExceeded):
+            convert_with(deck, Limits(max_table_cells=50), cache=cache)
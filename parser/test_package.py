@@ -0,0 +1,57 @@
+import os
+import zipfile
+
+import pytest
+
+from media_store import MediaStore
+from ppt_to_xml import build_pptx_xml
+from pptx_package import DirectoryPackage, ZipPackage
+from synthetic_deck import generate_deck
+from xml_to_json import collect_records, iter_pptx_records
+
+SLIDE_RELS = "ppt/slides/_rels/slide1.xml.rels"
+SECRET = b"host file, not part of the deck"
+
+
+@pytest.fixture
+def evil_deck(tmp_path):
+    """A deck whose first slide's image relationship climbs out of the package to tmp_path/secret.png."""
+    (tmp_path / "secret.png").write_bytes(SECRET)
+    good = tmp_path / "good.pptx"
+    generate_deck(str(good), slides=2, images_per_slide=1)
+    evil = tmp_path / "evil.pptx"
+    with zipfile.ZipFile(good) as src, zipfile.ZipFile(evil, "w") as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == SLIDE_RELS:
+                data = data.replace(b'Target="../media/', b'Target="../../../../secret.png" x="')
+            dst.writestr(info, data)
+    return evil
+
+def image_rels(package):
+    return [rel for rel in package.index.relationships("ppt/slides/slide1.xml").values() if rel["type"] == "image"]
+
+
+def test_zip_index_drops_targets_outside_package(evil_deck):
+    with ZipPackage(str(evil_deck)) as package:
+        assert image_rels(package) == []
+        assert package.index.related("ppt/slides/slide1.xml", "slideLayout")
+
+def test_directory_package_stays_inside_root(evil_deck, tmp_path):
+    root = tmp_path / "extracted"
+    with zipfile.ZipFile(evil_deck) as z:
+        z.extractall(root)
+    os.symlink(tmp_path / "secret.png", root / "ppt" / "media" / "linked.png")
+    package = DirectoryPackage(str(root))
+    assert image_rels(package) == []
+    assert not package.has_part("../secret.png")
+    assert not package.has_part("ppt/media/linked.png")
+    assert package.fingerprint("../secret.png") is None
+    with pytest.raises(ValueError):
+        package.read_part("../secret.png")
+
+    media_store = MediaStore(str(tmp_path / "media"))
+    output = collect_records(iter_pptx_records(build_pptx_xml(package), package, media_store))
+    assert len(output["slides"]) == 2
+    stored = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(tmp_path / "media") for name in names]
+    assert all(open(path, "rb").read() != SECRET for path in stored)
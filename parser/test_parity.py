@@ -0,0 +1,118 @@
+import re
+import zipfile
+
+import pytest
+
+from instrumentation import recording
+from limits import Limits
+from media_store import MediaStore
+from parse_cache import ParseCache
+from ppt_to_xml import open_package
+from synthetic_deck import generate_deck
+from text_extract import iter_deck_text
+from xml_to_json import NS, P_GRAPHIC_FRAME, P_PIC, P_SP, convert, iter_records, scan_shape
+
+# Decks covering text, tables, charts, shared media and several masters
+DECKS = {
+    "text": {"slides": 8, "shapes_per_slide": 10, "paragraphs_per_shape": 3},
+    "tables-charts": {"slides": 6, "table_rows": 4, "table_cols": 3, "charts_per_slide": 1},
+    "media": {"slides": 6, "images_per_slide": 3, "image_parts": 5, "duplicate_image_parts": 2},
+    "multi-master": {"slides": 8, "masters": 3, "layouts_per_master": 3},
+}
+
+# The find('.//...') lookup each scan_shape key stands in for
+SCAN_LOOKUPS = {
+    "fill_srgb": ".//a:solidFill/a:srgbClr",
+    "fill_scheme": ".//a:solidFill/a:schemeClr",
+    "ph": ".//p:nvPr/p:ph",
+    "ln": ".//a:ln",
+    "xfrm": ".//a:xfrm",
+    "prstGeom": ".//a:prstGeom",
+    "txBody": ".//p:txBody",
+    "blip": ".//a:blip",
+    "tbl": ".//a:tbl",
+    "chart": ".//c:chart",
+}
+
+
+@pytest.fixture(scope="module", params=sorted(DECKS))
+def deck(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp("decks") / f"{request.param}.pptx"
+    generate_deck(str(path), **DECKS[request.param])
+    return str(path)
+
+@pytest.fixture
+def media_store(tmp_path):
+    return MediaStore(str(tmp_path / "media"))
+
+def records(deck, media_store, **options):
+    return list(iter_records(deck, media_store=media_store, **options))
+
+
+def test_scan_shape_matches_descendant_lookups(deck):
+    package = open_package(deck)
+    try:
+        shapes = 0
+        for part_name, _, _ in package.index.slides:
+            for shape in package.load_xml(part_name).iter(P_SP, P_PIC, P_GRAPHIC_FRAME):
+                found = scan_shape(shape)
+                for key, path in SCAN_LOOKUPS.items():
+                    assert found.get(key) is shape.find(path, NS), (part_name, key)
+                shapes += 1
+        assert shapes
+    finally:
+        package.close()
+
+def test_positions_ignore_nested_ext(tmp_path):
+    """An a:blip/a:extLst/a:ext comes before a picture's spPr/a:xfrm; positions must still come from the xfrm."""
+    plain = tmp_path / "plain.pptx"
+    generate_deck(str(plain), slides=4, images_per_slide=3)
+    nested = tmp_path / "nested.pptx"
+    with zipfile.ZipFile(plain) as src, zipfile.ZipFile(nested, "w") as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if re.fullmatch(r"ppt/slides/slide\d+\.xml", info.filename):
+                data = re.sub(rb'(<a:blip [^>]*?)/>', rb'\1><a:extLst><a:ext uri="{28A0092B-C50C-407E-A947-70E740481C1C}"/>'
+                              rb'</a:extLst></a:blip>', data)
+            dst.writestr(info, data)
+
+    expected = convert(str(plain), media_store=MediaStore(None))
+    images = [element for slide in expected["slides"] for element in slide["elements"] if element["type"] == "image"]
+    assert len(images) == 12
+    assert all(image["position"]["width"] and image["position"]["height"] for image in images)
+    assert convert(str(nested), media_store=MediaStore(None)) == expected
+
+def test_parallel_matches_sequential(deck, media_store):
+    assert records(deck, media_store, slide_workers=2) == records(deck, media_store)
+
+def test_cached_matches_uncached(deck, media_store, tmp_path):
+    uncached = records(deck, media_store)
+    cache = ParseCache(str(tmp_path / "cache.db"))
+    try:
+        assert records(deck, media_store, cache=cache) == uncached
+        with recording() as recorder:
+            assert records(deck, media_store, cache=cache) == uncached
+        assert recorder.counters["cache_hits"] > 0
+        assert "cache_misses" not in recorder.counters
+    finally:
+        cache.close()
+
+def test_header_counts_slides(deck, media_store):
+    header, *slides = records(deck, media_store)
+    package = open_package(deck)
+    try:
+        assert header["record"] == "header"
+        assert header["slide_count"] == len(slides) == len(package.index.slides)
+    finally:
+        package.close()
+    assert [slide["index"] for slide in slides] == list(range(len(slides)))
+
+def test_streamed_parse_matches_tree_parse(deck, media_store):
+    streamed = records(deck, media_store, limits=Limits(stream_part_bytes=0))
+    assert streamed == records(deck, media_store)
+    assert streamed == records(deck, media_store, slide_workers=2, limits=Limits(stream_part_bytes=0))
+
+def test_text_tree_walk_matches_stream(deck):
+    tree = list(iter_deck_text(deck))
+    assert any(record["paragraphs"] for record in tree)
+    assert tree == list(iter_deck_text(deck, limits=Limits(stream_part_bytes=0)))
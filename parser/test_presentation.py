@@ -0,0 +1,39 @@
+import zipfile
+
+import pytest
+
+from media_store import MediaStore
+from presentation import Presentation
+from synthetic_deck import generate_deck
+from xml_to_json import iter_records
+
+
+@pytest.fixture
+def deck(tmp_path):
+    """A four-slide deck whose second slide part is truncated mid-element."""
+    good = tmp_path / "good.pptx"
+    generate_deck(str(good), slides=4)
+    bad = tmp_path / "bad.pptx"
+    with zipfile.ZipFile(good) as src, zipfile.ZipFile(bad, "w") as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == "ppt/slides/slide2.xml":
+                data = data[:len(data) // 2]
+            dst.writestr(info, data)
+    return str(bad)
+
+
+def test_slides_match_conversion(deck):
+    header, *records = iter_records(deck, media_store=MediaStore(None))
+    with Presentation(deck) as presentation:
+        assert presentation.slide_count == header["slide_count"]
+        assert list(presentation.slides) == records
+
+def test_malformed_slide_gets_error_record(deck):
+    with Presentation(deck) as presentation:
+        slide = presentation.slides[1]
+        assert slide["error"] == "slide2.xml could not be parsed"
+        assert slide["elements"] == [] and slide["background"] is None
+        assert presentation.text(1) == []
+        assert presentation.title(1) is None
+        assert presentation.text(0)
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from media_store import MediaStore
+from synthetic_deck import generate_deck
+from text_index import TextIndex, index_outputs
+from xml_to_json import convert, iter_records, write_ndjson
+
+
+def text_slide(*texts):
+    return {"elements": [{"type": "text", "content": [{"text": text}]} for text in texts]}
+
+def deck_output(*slides):
+    return {"slides": [text_slide(*texts) for texts in slides], "template": {}}
+
+
+@pytest.fixture
+def index(tmp_path):
+    with TextIndex(str(tmp_path / "index.db")) as index:
+        yield index
+
+def decks(results):
+    return sorted({result["deck"] for result in results})
+
+
+def test_add_deck_replaces_previous_postings(index):
+    index.add_deck("a", deck_output(["quarterly revenue"], ["churn retention"]))
+    index.add_deck("b", deck_output(["revenue target"]))
+    assert decks(index.term("revenue")) == ["a", "b"]
+
+    index.add_deck("a", deck_output(["roadmap launch"]))
+    assert decks(index.term("revenue")) == ["b"]
+    assert decks(index.term("churn")) == []
+    assert [(r["deck"], r["slide"]) for r in index.term("roadmap")] == [("a", 0)]
+    assert index.stats() == {"decks": 2, "slides": 2, "elements": 2}
+
+def test_remove_deck(index):
+    index.add_deck("a", deck_output(["revenue"]))
+    index.add_deck("b", deck_output(["revenue"]))
+    assert index.remove_deck("a")
+    assert not index.remove_deck("a")
+    assert decks(index.term("revenue")) == ["b"]
+    assert index.version("a") is None
+
+def test_term_and_phrase(index):
+    index.add_deck("a", deck_output(["Revenue growth in the quarter", "growth of revenue"]))
+    assert len(index.term("REVENUE")) == 2
+    assert len(index.phrase("revenue growth")) == 1
+    for text in ("revenue growth", "", "--", "don't"):
+        with pytest.raises(ValueError):
+            index.term(text)
+
+def test_malformed_query_is_value_error(index):
+    index.add_deck("a", deck_output(["revenue"]))
+    for query in ("revenue AND (", "nosuchcolumn:revenue"):
+        with pytest.raises(ValueError):
+            index.search(query)
+
+def test_index_outputs_skips_non_deck_files(index, tmp_path):
+    out = tmp_path / "out"
+    (out / "sub").mkdir(parents=True)
+    deck = str(tmp_path / "deck.pptx")
+    generate_deck(deck, slides=3)
+    with open(out / "deck.json", "w") as f:
+        json.dump(convert(deck, media_store=MediaStore(None)), f)
+    with open(out / "sub" / "deck.ndjson", "w") as f:
+        write_ndjson(iter_records(deck, media_store=MediaStore(None)), f)
+    (out / "benchmark.json").write_text(json.dumps({"results": [], "schema": 2}))
+    (out / "metrics.ndjson").write_text(json.dumps({"deck": "x", "seconds": 1}) + "\n")
+    (out / "broken.json").write_text("{nope")
+
+    assert index_outputs(index, str(out)) == (2, 0)
+    assert index.stats()["decks"] == 2
+    assert index_outputs(index, str(out)) == (0, 0)
+
+    # A deck output overwritten by something else is dropped like a deleted one
+    (out / "deck.json").write_text("[]")
+    os.remove(out / "sub" / "deck.ndjson")
+    assert index_outputs(index, str(out)) == (0, 2)
+    assert index.stats()["decks"] == 0
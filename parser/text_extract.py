@@ -0,0 +1,133 @@
+import argparse
+import json
+import logging
+import sys
+from lxml import etree
+from limits import DEFAULT_LIMITS
+from ppt_to_xml import open_package
+
+logger = logging.getLogger(__name__)
+
+A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+P = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+
+A_P, A_R, A_T = A + 'p', A + 'r', A + 't'
+P_SP, P_GRAPHIC_FRAME, P_PIC, P_GRP_SP, P_PH = P + 'sp', P + 'graphicFrame', P + 'pic', P + 'grpSp', P + 'ph'
+
+SHAPE_TAGS = (P_SP, P_GRAPHIC_FRAME, P_PIC, P_GRP_SP)
+TREE_TAGS = (*SHAPE_TAGS, A_P, P_PH, A_T)
+RUN_TEXT = f'{A_R}/{A_T}'
+TITLE_TYPES = ('title', 'ctrTitle')
+# Placeholders left out of slide elements by parse_slide, so left out here too
+SKIPPED_TYPES = ('sldNum', 'ftr', 'hdr')
+
+
+def tree_paragraphs(root):
+    """Return the {"text", "placeholder", "is_title"} paragraphs of a parsed slide part, as iter_paragraphs would.
+
+    One pass over the tree in document order: a shape's placeholder comes
+    before its paragraphs, and each a:r/a:t is added to the paragraph
+    started last, so no paragraph is searched again for its runs.
+    """
+    paragraphs = []
+    placeholder = None
+    skip = False
+    runs = None
+
+    def finish_paragraph():
+        text = "".join(runs) if runs else ""
+        if text:
+            paragraphs.append({"text": text, "placeholder": placeholder, "is_title": placeholder in TITLE_TYPES})
+
+    for elem in root.iter(TREE_TAGS):
+        tag = elem.tag
+        if tag == A_T:
+            if runs is not None and elem.text and elem.getparent().tag == A_R:
+                runs.append(elem.text)
+        elif tag == A_P:
+            finish_paragraph()
+            runs = None if skip else []
+        elif tag == P_PH:
+            placeholder = elem.get('type', 'body')
+            skip = placeholder in SKIPPED_TYPES
+        else:
+            finish_paragraph()
+            runs, placeholder, skip = None, None, False
+    finish_paragraph()
+    return paragraphs
+
+def iter_paragraphs(stream):
+    """Yield {"text", "placeholder", "is_title"} for each non-empty paragraph of a slide part, in document order.
+
+    The part is streamed with iterparse: each paragraph is read at its end
+    tag and every finished shape is cleared and dropped from the tree, so
+    memory stays flat however large the slide is. Like group_text_content,
+    only run text (a:r/a:t) counts. Paragraphs in table cells are included
+    with placeholder None.
+    """
+    placeholder = None
+    skip = False
+    for _, elem in etree.iterparse(stream, events=("end",), tag=(*SHAPE_TAGS, A_P, P_PH)):
+        tag = elem.tag
+        if tag == A_P:
+            if not skip:
+                text = "".join([t.text for t in elem.iterfind(RUN_TEXT) if t.text])
+                if text:
+                    yield {"text": text, "placeholder": placeholder, "is_title": placeholder in TITLE_TYPES}
+            elem.clear()
+        elif tag == P_PH:
+            # p:nvSpPr comes before p:txBody, so the placeholder is known before the shape's paragraphs
+            placeholder = elem.get('type', 'body')
+            skip = placeholder in SKIPPED_TYPES
+        else:
+            # A shape ended: the next paragraphs belong to a shape without a placeholder unless it has its own
+            placeholder, skip = None, False
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None:
+                # Drop finished siblings so the tree does not grow with the slide
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+def iter_deck_text(pptx_path, extract=False, limits=DEFAULT_LIMITS):
+    """Yield {"record": "slide_text", "index", "part", "paragraphs"} per slide in presentation order.
+
+    Only presentation.xml, its rels and the slide parts are read; no
+    layouts, masters, themes, geometry, styles or media. Like load_slide,
+    slide parts up to limits.stream_part_bytes are parsed as one tree and
+    larger ones streamed, and a missing or malformed slide is skipped (and
+    logged) without losing the rest of the deck; indices stay those of the
+    presentation order.
+    """
+    package = open_package(pptx_path, extract=extract)
+    if package is None:
+        return
+    try:
+        for index, (part_name, _, _) in enumerate(package.index.slides):
+            if not package.has_part(part_name):
+                continue
+            if package.part_size(part_name) <= limits.stream_part_bytes:
+                root = package.load_xml(part_name)
+                if root is None:
+                    continue
+                paragraphs = tree_paragraphs(root)
+            else:
+                try:
+                    with package.open_part(part_name) as stream:
+                        paragraphs = list(iter_paragraphs(stream))
+                except etree.XMLSyntaxError as e:
+                    logger.error("Error loading %s from %s: %s", part_name, package.source, e)
+                    continue
+            yield {"record": "slide_text", "index": index, "part": part_name, "paragraphs": paragraphs}
+    finally:
+        package.close()
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Print each slide's paragraph text as NDJSON (text only, fast).")
+    arg_parser.add_argument("pptx_file")
+    args = arg_parser.parse_args(argv)
+    for record in iter_deck_text(args.pptx_file):
+        sys.stdout.write(json.dumps(record) + "\n")
+
+if __name__ == "__main__":
+    main()
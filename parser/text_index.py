@@ -0,0 +1,276 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Element rows of deck n get rowids [n << ROWID_BITS, (n + 1) << ROWID_BITS), so a
+# deck's postings can be dropped with a rowid range scan instead of a table scan
+ROWID_BITS = 24
+# How SQLite words the errors of a MATCH query FTS5 cannot parse (as opposed to e.g. a locked database)
+QUERY_ERRORS = ("fts5:", "no such column", "unknown special query")
+
+
+def element_text(element):
+    """Searchable text of an output element: text shape paragraphs, or table cells, one per line."""
+    if element["type"] == "text":
+        return "\n".join(run["text"] for run in element["content"])
+    if element["type"] == "table":
+        return "\n".join(cell["content"] for row in element["rows"] for cell in row if cell["content"])
+    return ""
+
+def iter_slide_records(source):
+    """Slide records from converted output: a {"slides": [...]} dict or an iter_records/NDJSON record stream."""
+    if isinstance(source, dict):
+        for index, slide in enumerate(source["slides"]):
+            yield {"index": index, **slide}
+        return
+    for record in source:
+        if record.get("record", "slide") == "slide":
+            yield record
+
+def load_output(path):
+    """Read a converted deck written by xml_to_json (.json) or convert_ndjson (.ndjson)."""
+    with open(path) as f:
+        if path.endswith(".ndjson"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+def is_deck_output(output):
+    """Whether a loaded .json/.ndjson file is a converted deck, not some other output (metrics, benchmarks)."""
+    if isinstance(output, dict):
+        return isinstance(output.get("slides"), list)
+    return bool(output) and isinstance(output[0], dict) and output[0].get("record") == "header"
+
+def tokens(text):
+    """Split text into terms like the index's unicode61 tokenizer: runs of letters and digits."""
+    return re.findall(r"[^\W_]+", unicodedata.normalize("NFC", text))
+
+def quote(text):
+    """Quote text as one FTS5 string, i.e. a term or, with several words, a phrase."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class TextIndex:
+    """On-disk inverted index of the text in converted decks.
+
+    Built on SQLite FTS5 in one file: each text shape or table is one row
+    (a posting list entry keyed by deck, slide index and element index) and
+    FTS5 keeps the term -> postings index, with positions for phrase
+    queries. Decks are added, replaced and removed one transaction at a
+    time, so the index can be updated as conversions finish and read by
+    other processes meanwhile (WAL mode).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS decks ("
+                        "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL, version TEXT, "
+                        "slide_count INTEGER NOT NULL, element_count INTEGER NOT NULL, indexed_at REAL NOT NULL)")
+        self.db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS elements USING fts5("
+                        "text, deck_id UNINDEXED, slide UNINDEXED, element UNINDEXED, kind UNINDEXED, "
+                        "tokenize = 'unicode61 remove_diacritics 2')")
+
+    def _deck_id(self, name):
+        row = self.db.execute("SELECT id FROM decks WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def version(self, name):
+        """The version string a deck was indexed with (e.g. its output mtime), or None if it is not indexed."""
+        row = self.db.execute("SELECT version FROM decks WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def add_deck(self, name, output, version=None):
+        """Index (or re-index) one converted deck under `name`; returns the number of elements indexed.
+
+        `output` is what convert() returns or a stream of iter_records
+        records. Whatever was indexed for `name` before is replaced.
+        """
+        rows = []
+        slide_count = 0
+        for slide in iter_slide_records(output):
+            slide_count += 1
+            for element_index, element in enumerate(slide["elements"]):
+                text = element_text(element)
+                if text.strip():
+                    rows.append((text, slide["index"], element_index, element["type"]))
+        if len(rows) >= 1 << ROWID_BITS:
+            raise ValueError(f"{name} has too many text elements to index ({len(rows)})")
+
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            deck_id = self._deck_id(name)
+            if deck_id is not None:
+                self._delete_postings(deck_id)
+                self.db.execute("UPDATE decks SET version = ?, slide_count = ?, element_count = ?, indexed_at = ? "
+                                "WHERE id = ?", (version, slide_count, len(rows), time.time(), deck_id))
+            else:
+                deck_id = self.db.execute("INSERT INTO decks (name, version, slide_count, element_count, indexed_at) "
+                                          "VALUES (?, ?, ?, ?, ?)",
+                                          (name, version, slide_count, len(rows), time.time())).lastrowid
+            base = deck_id << ROWID_BITS
+            self.db.executemany("INSERT INTO elements (rowid, text, deck_id, slide, element, kind) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                ((base + n, text, deck_id, slide, element, kind)
+                                 for n, (text, slide, element, kind) in enumerate(rows)))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def _delete_postings(self, deck_id):
+        self.db.execute("DELETE FROM elements WHERE rowid >= ? AND rowid < ?",
+                        (deck_id << ROWID_BITS, (deck_id + 1) << ROWID_BITS))
+
+    def remove_deck(self, name):
+        """Drop a deck from the index; returns False if it was not indexed."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            deck_id = self._deck_id(name)
+            if deck_id is not None:
+                self._delete_postings(deck_id)
+                self.db.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return deck_id is not None
+
+    def search(self, query, limit=20, ranked=False, snippets=True):
+        """Run an FTS5 query and return [{"deck", "slide", "element", "kind", "snippet"}].
+
+        Results come in index order, which stops at `limit` matches and stays
+        fast however common the terms are; ranked=True orders by BM25
+        relevance instead, which has to score every match first. A query
+        FTS5 cannot parse raises ValueError.
+        """
+        snippet = "snippet(elements, 0, '[', ']', '...', 12)" if snippets else "NULL"
+        order = "ORDER BY rank" if ranked else ""
+        try:
+            rows = self.db.execute(f"SELECT d.name, e.slide, e.element, e.kind, {snippet} "
+                                   f"FROM elements e JOIN decks d ON d.id = e.deck_id "
+                                   f"WHERE elements MATCH ? {order} LIMIT ?", (query, limit)).fetchall()
+        except sqlite3.OperationalError as e:
+            if not str(e).startswith(QUERY_ERRORS):
+                raise
+            raise ValueError(f"invalid query {query!r}: {e}") from None
+        return [{"deck": deck, "slide": slide, "element": element, "kind": kind, "snippet": text}
+                for deck, slide, element, kind, text in rows]
+
+    def term(self, word, **options):
+        """Elements containing `word` (matched after the index's case and diacritic folding).
+
+        Raises ValueError unless `word` is a single token; use phrase() or
+        search() for several words.
+        """
+        if len(tokens(word)) != 1:
+            raise ValueError(f"not a single term: {word!r}")
+        return self.search(quote(word), **options)
+
+    def phrase(self, text, **options):
+        """Elements containing the words of `text` next to each other, in order."""
+        return self.search(quote(text), **options)
+
+    def stats(self):
+        decks, slides, elements = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(slide_count), 0), COALESCE(SUM(element_count), 0) FROM decks").fetchone()
+        return {"decks": decks, "slides": slides, "elements": elements}
+
+    def optimize(self):
+        """Merge the index segments left by many incremental updates (run after big batches)."""
+        self.db.execute("INSERT INTO elements (elements) VALUES ('optimize')")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def index_outputs(index, output_dir):
+    """Bring the index in line with the .json/.ndjson outputs under output_dir.
+
+    Decks are named by their output's path relative to output_dir. New or
+    rewritten outputs (by mtime and size) are (re)indexed, and decks whose
+    output has disappeared are removed. Files that are not converted decks
+    (e.g. metrics or benchmark results saved alongside) are logged and
+    skipped. Returns (indexed, removed).
+    """
+    seen = set()
+    indexed = 0
+    for dirpath, dirnames, filenames in os.walk(output_dir):
+        dirnames[:] = sorted(d for d in dirnames if d != "media")
+        for file_name in sorted(filenames):
+            if not file_name.endswith((".json", ".ndjson")):
+                continue
+            path = os.path.join(dirpath, file_name)
+            name = os.path.relpath(path, output_dir)
+            st = os.stat(path)
+            version = f"{st.st_mtime_ns}:{st.st_size}"
+            if index.version(name) != version:
+                try:
+                    output = load_output(path)
+                except ValueError as e:
+                    logger.warning("Skipping %s: %s", path, e)
+                    continue
+                if not is_deck_output(output):
+                    logger.warning("Skipping %s: not a converted deck", path)
+                    continue
+                index.add_deck(name, output, version)
+                indexed += 1
+            seen.add(name)
+    stale = [name for (name,) in index.db.execute("SELECT name FROM decks") if name not in seen]
+    for name in stale:
+        index.remove_deck(name)
+    return indexed, len(stale)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Full-text index over converted decks.")
+    arg_parser.add_argument("index", help="index file")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    update = commands.add_parser("update", help="index new or changed outputs in a directory, drop removed ones")
+    update.add_argument("output_dir")
+    remove = commands.add_parser("remove", help="remove a deck from the index")
+    remove.add_argument("deck")
+    for name in ("search", "term", "phrase"):
+        query = commands.add_parser(name, help={"search": "FTS5 query", "term": "one word",
+                                                "phrase": "words next to each other"}[name])
+        query.add_argument("query")
+        query.add_argument("-n", "--limit", type=int, default=20)
+        query.add_argument("--ranked", action="store_true", help="order by relevance (slower for common terms)")
+    commands.add_parser("stats")
+    args = arg_parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    with TextIndex(args.index) as index:
+        if args.command == "update":
+            indexed, removed = index_outputs(index, args.output_dir)
+            print(f"Indexed {indexed} decks, removed {removed}: {index.stats()}")
+        elif args.command == "remove":
+            print("Removed" if index.remove_deck(args.deck) else "Not indexed")
+        elif args.command == "stats":
+            print(json.dumps(index.stats()))
+        else:
+            start = time.perf_counter()
+            try:
+                results = getattr(index, args.command)(args.query, limit=args.limit, ranked=args.ranked)
+            except ValueError as e:
+                arg_parser.error(str(e))
+            for result in results:
+                print(json.dumps(result))
+            print(f"{len(results)} results in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    main()
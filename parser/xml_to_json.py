@@ -1,9 +1,17 @@
+import contextlib
 import os
-import zipfile
 import json
+import logging
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
 from lxml import etree
-import shutil
-from ppt_to_xml import pptx_to_xml
+import instrumentation
+from instrumentation import increment, profiling, recording, stage, timed, Recorder
+from limits import DEFAULT_LIMITS, LimitExceeded
+from ppt_to_xml import open_package, build_pptx_xml, write_pptx_xml
+from media_store import MediaStore
+from parse_cache import DeckCache, ParseCache, part_cache_key
+from pptx_package import rels_part_for
 
 NS = {
     'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
@@ -12,30 +20,94 @@ NS = {
     'c': 'http://schemas.openxmlformats.org/drawingml/2006/chart'
 }
 
-def extract_background(slide_elem, rels_elem, extract_dir, slide_index):
-    bg = slide_elem.find('.//p:bg', NS)
+A = f"{{{NS['a']}}}"
+P = f"{{{NS['p']}}}"
+C = f"{{{NS['c']}}}"
+
+# Tags the single-pass shape walker dispatches on
+A_SOLID_FILL, A_SRGB_CLR, A_SCHEME_CLR = A + 'solidFill', A + 'srgbClr', A + 'schemeClr'
+A_LN, A_XFRM, A_PRST_GEOM, A_OFF, A_EXT = A + 'ln', A + 'xfrm', A + 'prstGeom', A + 'off', A + 'ext'
+A_BLIP, A_TBL, A_TR, A_TC = A + 'blip', A + 'tbl', A + 'tr', A + 'tc'
+A_P, A_R, A_T, A_RPR, A_LATIN = A + 'p', A + 'r', A + 't', A + 'rPr', A + 'latin'
+P_SP, P_PIC, P_GRAPHIC_FRAME = P + 'sp', P + 'pic', P + 'graphicFrame'
+P_NV_PR, P_PH, P_TX_BODY, P_BG, P_BG_PR = P + 'nvPr', P + 'ph', P + 'txBody', P + 'bg', P + 'bgPr'
+C_CHART = C + 'chart'
+R_EMBED = f"{{{NS['r']}}}embed"
+R_ID = f"{{{NS['r']}}}id"
+
+P_SP_PR, P_GRP_SP_PR, P_XFRM = P + 'spPr', P + 'grpSpPr', P + 'xfrm'
+
+# Precompiled lookups that are not covered by the shape walker
+BG_BLIP = etree.XPath('.//a:blipFill/a:blip', namespaces=NS)
+
+_SCAN_KEYS = {A_LN: "ln", A_XFRM: "xfrm", A_PRST_GEOM: "prstGeom", P_TX_BODY: "txBody",
+              A_BLIP: "blip", A_TBL: "tbl", C_CHART: "chart"}
+_SCAN_TAGS = (A_SRGB_CLR, A_SCHEME_CLR, P_PH, *_SCAN_KEYS)
+
+logger = logging.getLogger(__name__)
+
+def scan_shape(shape):
+    """Walk a shape's subtree once and return the first descendant of each tag the extractors need.
+
+    Keys mirror the find('.//...') lookups they replace: "fill_srgb"/"fill_scheme"
+    are the first srgbClr/schemeClr directly under an a:solidFill, "ph" the
+    shape's placeholder (p:nvSpPr/p:nvPr/p:ph), and the rest are keyed by local
+    tag name.
+    """
+    found = {}
+    for el in shape.iter(_SCAN_TAGS):
+        tag = el.tag
+        if tag == A_SRGB_CLR or tag == A_SCHEME_CLR:
+            key = "fill_srgb" if tag == A_SRGB_CLR else "fill_scheme"
+            if key not in found and el.getparent().tag == A_SOLID_FILL:
+                found[key] = el
+        elif tag == P_PH:
+            if "ph" not in found and el.getparent().tag == P_NV_PR:
+                found["ph"] = el
+        else:
+            found.setdefault(_SCAN_KEYS[tag], el)
+    return found
+
+def _first_solid_fill(element):
+    """First srgbClr and schemeClr directly under an a:solidFill inside `element`."""
+    srgb = scheme = None
+    for el in element.iter(A_SRGB_CLR, A_SCHEME_CLR):
+        if el.getparent().tag != A_SOLID_FILL:
+            continue
+        if el.tag == A_SRGB_CLR:
+            srgb = srgb if srgb is not None else el
+        else:
+            scheme = scheme if scheme is not None else el
+    return srgb, scheme
+
+def related_part(rels, r_id):
+    """Resolved target part of an internal relationship from a PackageIndex rels dict, or None."""
+    rel = rels.get(r_id) if rels else None
+    if rel is None or rel["target_mode"] == 'External':
+        return None
+    return rel["target"]
+
+@timed("extract_background")
+def extract_background(slide_elem, rels, package, media_store, inherited=None):
+    """Background of a slide, layout or master; without one of its own it falls back to
+    `inherited` (the layout's or master's resolved background), then to white."""
+    default = inherited or {"type": "color", "value": "FFFFFF"}
+    bg = next(slide_elem.iter(P_BG), None)
     if bg is None:
-        return {"type": "color", "value": "FFFFFF"}
-    bg_pr = bg.find('.//p:bgPr', NS)
+        return default
+    bg_pr = next(bg.iter(P_BG_PR), None)
     if bg_pr is not None:
-        solid_fill = bg_pr.find('.//a:solidFill/a:srgbClr', NS)
+        solid_fill, scheme_fill = _first_solid_fill(bg_pr)
         if solid_fill is not None:
             return {"type": "color", "value": solid_fill.get('val', 'FFFFFF')}
-        scheme_fill = bg_pr.find('.//a:solidFill/a:schemeClr', NS)
         if scheme_fill is not None:
             return {"type": "color", "value": scheme_fill.get('val', 'FFFFFF')}
-        blip_fill = bg_pr.find('.//a:blipFill/a:blip', NS)
+        blip_fill = next(iter(BG_BLIP(bg_pr)), None)
         if blip_fill is not None:
-            r_id = blip_fill.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed')
-            rel = rels_elem.find(f'.//r:Relationship[@Id="{r_id}"]', NS) if rels_elem is not None else None
-            if rel:
-                img_path = rel.get('Target', '').replace('../media/', '')
-                full_path = os.path.join(extract_dir, 'ppt', 'media', img_path)
-                if os.path.exists(full_path):
-                    output_path = f"background_slide_{slide_index}.{img_path.split('.')[-1]}"
-                    shutil.copy(full_path, output_path)
-                    return {"type": "image", "file": output_path}
-    return {"type": "color", "value": "FFFFFF"}
+            part_name = related_part(rels, blip_fill.get(R_EMBED))
+            if part_name is not None and package.has_part(part_name):
+                return {"type": "image", **media_store.add(package, part_name)}
+    return default
 
 def extract_text_attributes(run):
     attrs = {
@@ -46,26 +118,46 @@ def extract_text_attributes(run):
         "font": "Arial",
         "color": "000000"
     }
-    rpr = run.find('.//a:rPr', NS)
+    # a:rPr is a direct child of a run; for paragraphs and table cells take the first one inside
+    rpr = run.find(A_RPR) if run.tag == A_R else next(run.iter(A_RPR), None)
     if rpr is not None:
         attrs["size"] = int(rpr.get('sz', 1800)) / 100
         attrs["bold"] = rpr.get('b') == '1'
         attrs["italic"] = rpr.get('i') == '1'
         attrs["underline"] = rpr.get('u') is not None and rpr.get('u') != 'none'
-        latin = rpr.find('.//a:latin', NS)
+        latin = color = scheme_color = None
+        for el in rpr.iter(A_LATIN, A_SRGB_CLR, A_SCHEME_CLR):
+            if el.tag == A_LATIN:
+                latin = latin if latin is not None else el
+            elif el.tag == A_SRGB_CLR:
+                color = color if color is not None else el
+            else:
+                scheme_color = scheme_color if scheme_color is not None else el
         if latin is not None:
             attrs["font"] = latin.get('typeface', 'Arial')
-        color = rpr.find('.//a:srgbClr', NS)
         if color is not None:
             attrs["color"] = color.get('val', '000000')
-        scheme_color = rpr.find('.//a:schemeClr', NS)
         if scheme_color is not None:
             attrs["color"] = scheme_color.get('val', '000000')
     return attrs
 
+def own_xfrm(element):
+    """The element's own transform: spPr/xfrm for shapes and pictures, p:xfrm for graphic frames.
+
+    A descendant search could pick up a nested a:off/a:ext instead, e.g. the
+    a:extLst/a:ext inside a picture's a:blip.
+    """
+    sp_pr = element.find(P_SP_PR)
+    if sp_pr is None:
+        sp_pr = element.find(P_GRP_SP_PR)
+    if sp_pr is not None:
+        return sp_pr.find(A_XFRM)
+    return element.find(P_XFRM)
+
 def extract_position(element):
-    off = element.find('.//a:off', NS)
-    ext = element.find('.//a:ext', NS)
+    xfrm = own_xfrm(element)
+    off = xfrm.find(A_OFF) if xfrm is not None else None
+    ext = xfrm.find(A_EXT) if xfrm is not None else None
     return {
         "x": int(off.get('x', 0)) if off is not None else 0,
         "y": int(off.get('y', 0)) if off is not None else 0,
@@ -73,28 +165,28 @@ def extract_position(element):
         "height": int(ext.get('cy', 0)) if ext is not None else 0
     }
 
-def extract_shape_style(shape):
+def extract_shape_style(shape, found=None):
+    found = found if found is not None else scan_shape(shape)
     style = {}
-    solid_fill = shape.find('.//a:solidFill/a:srgbClr', NS)
+    solid_fill = found.get("fill_srgb")
     if solid_fill is not None:
         style["fill_color"] = solid_fill.get('val')
-    scheme_fill = shape.find('.//a:solidFill/a:schemeClr', NS)
+    scheme_fill = found.get("fill_scheme")
     if scheme_fill is not None:
         style["fill_color"] = scheme_fill.get('val')
-    ln = shape.find('.//a:ln', NS)
+    ln = found.get("ln")
     if ln is not None:
-        ln_fill = ln.find('.//a:solidFill/a:srgbClr', NS)
+        ln_fill, ln_scheme = _first_solid_fill(ln)
         if ln_fill is not None:
             style["border_color"] = ln_fill.get('val')
             style["border_width"] = int(ln.get('w', 0)) / 9525 if ln.get('w') else 0
-        ln_scheme = ln.find('.//a:solidFill/a:schemeClr', NS)
         if ln_scheme is not None:
             style["border_color"] = ln_scheme.get('val')
             style["border_width"] = int(ln.get('w', 0)) / 9525 if ln.get('w') else 0
         if "border_color" not in style:
             style["border_color"] = None
             style["border_width"] = 0
-    xfrm = shape.find('.//a:xfrm', NS)
+    xfrm = found.get("xfrm")
     if xfrm is not None:
         style["rotation"] = int(xfrm.get('rot', 0)) / 60000
     return style
@@ -102,19 +194,22 @@ def extract_shape_style(shape):
 def group_text_content(paragraphs):
     content = []
     for p in paragraphs:
-        runs = p.findall('.//a:r', NS)
-        p_text = ""
-        current_attrs = None
-        for r in runs:
-            text = r.find('.//a:t', NS)
-            if text is not None and text.text:
-                p_text += text.text
-                current_attrs = extract_text_attributes(r)
-        if p_text:
-            content.append({"text": p_text, "attributes": current_attrs or extract_text_attributes(p)})
+        texts = []
+        last_run = None
+        # A run holds a single a:t, so walking the texts visits each run's text once
+        for text in p.iter(A_T):
+            if text.text:
+                run = text.getparent()
+                if run.tag == A_R:
+                    texts.append(text.text)
+                    last_run = run
+        if texts:
+            # The paragraph takes the attributes of its last non-empty run
+            content.append({"text": "".join(texts), "attributes": extract_text_attributes(last_run)})
     return content
 
-def extract_text_shape(shape, is_header=False, is_background=False, is_page_number=False):
+def extract_text_shape(shape, is_header=False, is_background=False, is_page_number=False, found=None):
+    found = found if found is not None else scan_shape(shape)
     text_data = {
         "type": "text",
         "content": [],
@@ -125,53 +220,53 @@ def extract_text_shape(shape, is_header=False, is_background=False, is_page_numb
         "is_background": is_background,
         "is_page_number": is_page_number
     }
-    tx_body = shape.find('.//p:txBody', NS)
+    tx_body = found.get("txBody")
     if tx_body is not None:
-        text_data["content"] = group_text_content(tx_body.findall('.//a:p', NS))
+        text_data["content"] = group_text_content(tx_body.iter(A_P))
         if not text_data["content"]:
             return None
-    fill = shape.find('.//a:solidFill/a:srgbClr', NS)
+    fill = found.get("fill_srgb")
     if fill is not None:
         text_data["shape_background"] = fill.get('val')
-    scheme_fill = shape.find('.//a:solidFill/a:schemeClr', NS)
+    scheme_fill = found.get("fill_scheme")
     if scheme_fill is not None:
         text_data["shape_background"] = scheme_fill.get('val')
     return text_data
 
-def extract_shape(shape):
-    geom = shape.find('.//a:prstGeom', NS)
+def extract_shape(shape, found=None):
+    found = found if found is not None else scan_shape(shape)
+    geom = found.get("prstGeom")
     if geom is None:
         return None
     return {
         "type": "shape",
         "shape_type": geom.get('prst', 'unknown'),
         "position": extract_position(shape),
-        "style": extract_shape_style(shape),
+        "style": extract_shape_style(shape, found),
         "z_order": int(shape.get('order', 0))
     }
 
-def extract_image(pic, rels_elem, extract_dir, slide_index):
-    blip = pic.find('.//a:blip', NS)
+@timed("extract_image")
+def extract_image(pic, rels, package, media_store, found=None):
+    found = found if found is not None else scan_shape(pic)
+    blip = found.get("blip")
     if blip is None:
         return None
-    r_id = blip.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed')
-    rel = rels_elem.find(f'.//r:Relationship[@Id="{r_id}"]', NS) if rels_elem is not None else None
-    if rel:
-        img_path = rel.get('Target', '').replace('../media/', '')
-        full_path = os.path.join(extract_dir, 'ppt', 'media', img_path)
-        if os.path.exists(full_path):
-            output_path = f"image_slide_{slide_index}_{os.path.basename(img_path)}"
-            shutil.copy(full_path, output_path)
-            return {
-                "type": "image",
-                "file": output_path,
-                "position": extract_position(pic),
-                "z_order": int(pic.get('order', 0))
-            }
+    part_name = related_part(rels, blip.get(R_EMBED))
+    if part_name is not None and package.has_part(part_name):
+        return {
+            "type": "image",
+            **media_store.add(package, part_name),
+            "position": extract_position(pic),
+            "z_order": int(pic.get('order', 0))
+        }
     return None
 
-def extract_table(graphic_frame):
-    table = graphic_frame.find('.//a:tbl', NS)
+@timed("extract_table")
+def extract_table(graphic_frame, found=None, max_cells=None):
+    """Table of a graphic frame; raises LimitExceeded past max_cells cells."""
+    found = found if found is not None else scan_shape(graphic_frame)
+    table = found.get("tbl")
     if table is None:
         return None
     table_data = {
@@ -180,103 +275,236 @@ def extract_table(graphic_frame):
         "rows": [],
         "z_order": int(graphic_frame.get('order', 0))
     }
-    for tr in table.findall('.//a:tr', NS):
+    cells = 0
+    for tr in table.iter(A_TR):
         row = []
-        for tc in tr.findall('.//a:tc', NS):
-            text = tc.find('.//a:t', NS)
+        for tc in tr.iter(A_TC):
+            cells += 1
+            if max_cells is not None and cells > max_cells:
+                raise LimitExceeded(f"table has more than {max_cells} cells")
+            text = next(tc.iter(A_T), None)
             content = text.text or "" if text is not None else ""
             row.append({"content": content, "attributes": extract_text_attributes(tc)})
         table_data["rows"].append(row)
     return table_data
 
-def extract_chart(graphic_frame, rels_elem, extract_dir, slide_index):
-    chart = graphic_frame.find('.//c:chart', NS)
+@timed("extract_chart")
+def extract_chart(graphic_frame, rels, package, media_store, found=None):
+    found = found if found is not None else scan_shape(graphic_frame)
+    chart = found.get("chart")
     if chart is None:
         return None
-    r_id = chart.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-    rel = rels_elem.find(f'.//r:Relationship[@Id="{r_id}"]', NS) if rels_elem is not None else None
-    if rel:
-        chart_path = rel.get('Target', '').replace('../charts/', '')
-        full_path = os.path.join(extract_dir, 'ppt', 'charts', chart_path)
-        if os.path.exists(full_path):
-            output_path = f"chart_slide_{slide_index}_{os.path.basename(chart_path)}"
-            shutil.copy(full_path, output_path)
-            return {
-                "type": "chart",
-                "chart_file": output_path,
-                "position": extract_position(graphic_frame),
-                "z_order": int(graphic_frame.get('order', 0))
-            }
+    part_name = related_part(rels, chart.get(R_ID))
+    if part_name is not None and package.has_part(part_name):
+        ref = media_store.add(package, part_name)
+        return {
+            "type": "chart",
+            "chart_file": ref["file"],
+            "sha256": ref["sha256"],
+            "part": ref["part"],
+            "position": extract_position(graphic_frame),
+            "z_order": int(graphic_frame.get('order', 0))
+        }
     return None
 
+@timed("parse_master")
 def parse_master(master_elem):
     background_elements = []
-    for sp in master_elem.findall('.//p:sp', NS):
-        ph = sp.find('.//p:nvSpPr/p:ph', NS)
+    for sp in master_elem.iter(P_SP):
+        found = scan_shape(sp)
+        ph = found.get("ph")
         is_background = ph is not None and ph.get('type') in ['title', 'sldNum', 'ftr', 'hdr']
         is_page_number = ph is not None and ph.get('type') == 'sldNum'
         text_shape = extract_text_shape(sp, is_header=ph is not None and ph.get('type') in ['title', 'hdr'], 
-                                        is_background=is_background, is_page_number=is_page_number)
+                                        is_background=is_background, is_page_number=is_page_number,
+                                        found=found)
         if text_shape and text_shape["content"]:
             background_elements.append(text_shape)
         else:
-            shape = extract_shape(sp)
+            shape = extract_shape(sp, found)
             if shape:
                 background_elements.append(shape)
     return background_elements
 
-def parse_slide(slide_elem, rels_elem, extract_dir, slide_index, background_elements):
-    slide_data = {
-        "background": extract_background(slide_elem, rels_elem, extract_dir, slide_index),
-        "background_elements": background_elements.copy(),
-        "elements": []
-    }
-    
-    shapes = slide_elem.findall('.//p:sp', NS)
-    for i, sp in enumerate(shapes):
-        ph = sp.find('.//p:nvSpPr/p:ph', NS)
+def master_placeholder_type(ph_type):
+    """The master placeholder a layout placeholder of this type inherits from."""
+    if ph_type in ('title', 'ctrTitle'):
+        return 'title'
+    if ph_type in ('dt', 'ftr', 'sldNum', 'hdr'):
+        return ph_type
+    return 'body'
+
+def master_placeholders(master_elem):
+    """{placeholder type: position} for the placeholders a master defines."""
+    positions = {}
+    for sp in master_elem.iter(P_SP):
+        ph = scan_shape(sp).get("ph")
+        if ph is not None:
+            positions.setdefault(ph.get('type', 'body'), extract_position(sp))
+    return positions
+
+def inherited_position(ph, layout):
+    """Position a slide placeholder without its own xfrm takes from its layout (by idx, then type)."""
+    if not layout:
+        return None
+    idx = ph.get('idx')
+    ph_type = ph.get('type', 'body')
+    match = None
+    if idx is not None:
+        match = next((p for p in layout["placeholders"] if p["idx"] == idx), None)
+    if match is None:
+        match = next((p for p in layout["placeholders"] if p["type"] == ph_type), None)
+    return dict(match["position"]) if match else None
+
+def slide_shape_elements(el, rels, package, media_store, layout=None, limits=DEFAULT_LIMITS):
+    """Output elements (zero, one or two) for one p:sp, p:pic or p:graphicFrame of a slide."""
+    if el.tag == P_SP:
+        found = scan_shape(el)
+        ph = found.get("ph")
         is_header = ph is not None and ph.get('type') in ['title', 'ctrTitle']
         is_background = ph is not None and ph.get('type') in ['sldNum', 'ftr', 'hdr']
-        if not is_background:
-            text_shape = extract_text_shape(sp, is_header=is_header)
-            if text_shape:
-                if ph and ph.get('type') == 'sldNum':
-                    text_shape["is_page_number"] = True
-                slide_data["elements"].append(text_shape)
-            else:
-                shape = extract_shape(sp)
-                if shape:
-                    slide_data["elements"].append(shape)
-    
-    for pic in slide_elem.findall('.//p:pic', NS):
-        image = extract_image(pic, rels_elem, extract_dir, slide_index)
-        if image:
-            slide_data["elements"].append(image)
-    
-    for gf in slide_elem.findall('.//p:graphicFrame', NS):
-        table = extract_table(gf)
-        if table:
-            slide_data["elements"].append(table)
-        chart = extract_chart(gf, rels_elem, extract_dir, slide_index)
-        if chart:
-            slide_data["elements"].append(chart)
-    
-    slide_data["elements"].sort(key=lambda x: (x["z_order"], x["position"]["y"]))
+        if is_background:
+            return []
+        element = extract_text_shape(el, is_header=is_header, found=found) or extract_shape(el, found)
+        if not element:
+            return []
+        if ph is not None and own_xfrm(el) is None:
+            element["position"] = inherited_position(ph, layout) or element["position"]
+        return [element]
+    if el.tag == P_PIC:
+        image = extract_image(el, rels, package, media_store)
+        return [image] if image else []
+    found = scan_shape(el)
+    table = extract_table(el, found, max_cells=limits.max_table_cells)
+    chart = extract_chart(el, rels, package, media_store, found)
+    return [element for element in (table, chart) if element]
+
+def _slide_data(background, buckets):
+    # Shapes, then pictures, then graphic frames, as the per-type passes used to emit them
+    elements = buckets[P_SP] + buckets[P_PIC] + buckets[P_GRAPHIC_FRAME]
+    elements.sort(key=lambda x: (x["z_order"], x["position"]["y"]))
+    if instrumentation.enabled():
+        for element in elements:
+            increment(f"elements.{element['type']}")
+    return {"background": background, "elements": elements}
+
+@timed("parse_slide")
+def parse_slide(slide_elem, rels, package, media_store, layout=None, limits=DEFAULT_LIMITS):
+    """Parse one slide; `rels` is the slide's {rId: relationship} dict from the PackageIndex.
+
+    `layout` is the slide's resolved layout (see resolve_layout): slides
+    without a background of their own inherit its background, and placeholders
+    without their own xfrm inherit its placeholder positions. Media and chart
+    parts go through `media_store`, so elements carry a content hash and
+    archive member rather than a per-slide copy.
+    """
+    background = extract_background(slide_elem, rels, package, media_store,
+                                     inherited=layout["background"] if layout else None)
+    buckets = {P_SP: [], P_PIC: [], P_GRAPHIC_FRAME: []}
+    for el in slide_elem.iter(P_SP, P_PIC, P_GRAPHIC_FRAME):
+        buckets[el.tag].extend(slide_shape_elements(el, rels, package, media_store, layout, limits))
+    return _slide_data(background, buckets)
+
+@timed("parse_slide")
+def parse_slide_stream(stream, rels, package, media_store, layout=None, limits=DEFAULT_LIMITS):
+    """parse_slide for a slide part read from `stream` with iterparse, for parts too big to hold as one tree.
+
+    Each shape is converted at its end tag, then cleared and unlinked along
+    with the finished shapes before it, so memory is bounded by the largest
+    single shape plus the output rather than by the whole part. The output
+    is the same as parse_slide's.
+    """
+    buckets = {P_SP: [], P_PIC: [], P_GRAPHIC_FRAME: []}
+    events = etree.iterparse(stream, events=("end",), tag=(P_SP, P_PIC, P_GRAPHIC_FRAME), remove_blank_text=True)
+    for _, el in events:
+        buckets[el.tag].extend(slide_shape_elements(el, rels, package, media_store, layout, limits))
+        el.clear()
+        parent = el.getparent()
+        while el.getprevious() is not None:
+            del parent[0]
+    # p:bg sits in p:cSld ahead of p:spTree, so the cleared tree still holds it
+    background = extract_background(events.root, rels, package, media_store,
+                                    inherited=layout["background"] if layout else None)
+    return _slide_data(background, buckets)
+
+def load_slide(package, part_name, rels, media_store, layout=None, limits=DEFAULT_LIMITS):
+    """Read and parse one slide part, or return None if it is missing or malformed.
+
+    Parts larger than limits.stream_part_bytes go through parse_slide_stream.
+    The slide's tree is dropped before this returns, so converting slide by
+    slide only ever holds one slide in memory.
+    """
+    if not package.has_part(part_name):
+        return None
+    size = package.part_size(part_name)
+    if size <= limits.stream_part_bytes:
+        slide_elem = package.load_xml(part_name)
+        return parse_slide(slide_elem, rels, package, media_store, layout, limits) if slide_elem is not None else None
+    try:
+        with stage("load_xml"), package.open_part(part_name) as stream:
+            slide_data = parse_slide_stream(stream, rels, package, media_store, layout, limits)
+    except etree.XMLSyntaxError as e:
+        logger.error("Error loading %s from %s: %s", part_name, package.source, e)
+        return None
+    increment("parts_loaded")
+    increment("bytes_read", size)
     return slide_data
 
-def parse_layout(layout_elem):
+def parse_layout(layout_elem, inherited_placeholders=None):
+    """Layout name and placeholders; placeholders without their own xfrm take the
+    position of the matching master placeholder from `inherited_placeholders`."""
     c_sld = layout_elem.find('.//p:cSld', NS)
     name = c_sld.get('name', 'unknown') if c_sld is not None else 'unknown'
-    placeholders = [
-        {
-            "type": ph.get('type', 'body'),
-            "position": extract_position(sp)
-        }
-        for sp in layout_elem.findall('.//p:sp', NS)
-        if (ph := sp.find('.//p:nvSpPr/p:ph', NS)) is not None
-    ]
+    placeholders = []
+    for sp in layout_elem.iter(P_SP):
+        ph = scan_shape(sp).get("ph")
+        if ph is None:
+            continue
+        ph_type = ph.get('type', 'body')
+        position = extract_position(sp)
+        if own_xfrm(sp) is None and inherited_placeholders:
+            position = dict(inherited_placeholders.get(master_placeholder_type(ph_type), position))
+        placeholders.append({"type": ph_type, "idx": ph.get('idx'), "position": position})
     return {"name": name, "placeholders": placeholders}
 
+def part_id(part_name):
+    """Id used to reference a template part from slides, e.g. ppt/slideLayouts/slideLayout2.xml -> slideLayout2."""
+    return posixpath.splitext(posixpath.basename(part_name))[0]
+
+@timed("resolve_master")
+def resolve_master(master_elem, part_name, package, media_store):
+    """Everything a master hands down to its layouts and slides, computed once per master."""
+    index = package.index
+    themes = index.related(part_name, "theme")
+    return {
+        "id": part_id(part_name),
+        "theme": part_id(themes[0]) if themes else None,
+        "background": extract_background(master_elem, index.relationships(part_name), package, media_store),
+        "background_elements": parse_master(master_elem),
+        "placeholders": master_placeholders(master_elem),
+    }
+
+@timed("resolve_layout")
+def resolve_layout(layout_elem, part_name, master, package, media_store):
+    """A layout with its master's inheritance applied, computed once per layout and shared by its slides."""
+    layout_data = parse_layout(layout_elem, master["placeholders"] if master else None)
+    return {
+        "id": part_id(part_name),
+        "name": layout_data["name"],
+        "master": master["id"] if master else None,
+        "background": extract_background(layout_elem, package.index.relationships(part_name), package, media_store,
+                                         inherited=master["background"] if master else None),
+        "placeholders": layout_data["placeholders"],
+    }
+
+def resolve_inherited(slide, template):
+    """Return a copy of a slide record with its master's background elements inlined,
+    for consumers that want each slide self-contained."""
+    masters = {master["id"]: master for master in template.get("masters", [])}
+    master = masters.get(slide.get("master"))
+    return {**slide, "background_elements": list(master["background_elements"]) if master else []}
+
+@timed("parse_theme")
 def parse_theme(theme_elem):
     clr_scheme = theme_elem.find('.//a:clrScheme', NS)
     theme_data = {"colors": {}}
@@ -287,90 +515,384 @@ def parse_theme(theme_elem):
                 theme_data["colors"][clr.tag.split('}')[-1]] = srgb_clr.get('val')
     return theme_data
 
-def main(pptx_file):
+# Per-process state for parse_slides_parallel workers
+_worker_package = None
+_worker_media_store = None
+_worker_limits = DEFAULT_LIMITS
+_worker_instrumented = False
+
+def _init_slide_worker(package_type, package_source, media_store, limits=DEFAULT_LIMITS, instrumented=False):
+    global _worker_package, _worker_media_store, _worker_limits, _worker_instrumented
+    _worker_package = package_type(package_source)
+    _worker_media_store = media_store
+    _worker_limits = limits
+    _worker_instrumented = instrumented
+
+def _parse_slide_job(job):
+    """Load and parse one slide; when the parent is recording, also return what the worker recorded."""
+    part_name, rels, layout = job
+    if not _worker_instrumented:
+        return load_slide(_worker_package, part_name, rels, _worker_media_store, layout, _worker_limits), None
+    with recording() as recorder:
+        slide_data = load_slide(_worker_package, part_name, rels, _worker_media_store, layout, _worker_limits)
+    return slide_data, recorder.snapshot()
+
+def iter_slides_parallel(slide_jobs, package, media_store, workers, limits=DEFAULT_LIMITS):
+    """Run load_slide for (part_name, rels, layout) jobs over a process pool, yielding results in job order.
+
+    Workers get only the slide's part name, its rels dict and its resolved
+    layout; the media store is shipped once per worker and each worker opens
+    its own handle on the package and reads the slide from it. Results are
+    yielded in job order as soon as each one is ready, so the output is
+    identical to parsing the slides one after another. What the workers
+    record is merged into the active instrumentation recorder.
+    """
+    recorder = instrumentation.active()
+    with ProcessPoolExecutor(max_workers=min(workers, len(slide_jobs)),
+                             initializer=_init_slide_worker,
+                             initargs=(type(package), package.source, media_store, limits,
+                                       recorder is not None)) as pool:
+        for slide_data, snapshot in pool.map(_parse_slide_job, slide_jobs,
+                                             chunksize=max(1, len(slide_jobs) // (workers * 4))):
+            if snapshot is not None:
+                recorder.merge(snapshot)
+            yield slide_data
+
+def template_parts(package, folder):
+    """Part names of the .xml parts directly inside a package folder, in listing order."""
+    return [f"{folder}/{name}" for name in package.list_parts(folder, ".xml") or []]
+
+def first_related(index, part_name, rel_type):
+    targets = index.related(part_name, rel_type) if part_name else []
+    return targets[0] if targets else None
+
+def _own_dependencies(index, part_name):
+    """A part, its rels and the non-template parts they point at (media, charts, theme)."""
+    deps = [part_name, rels_part_for(part_name)]
+    deps += [rel["target"] for rel in index.relationships(part_name).values()
+             if rel["target_mode"] != 'External' and rel["type"] not in ("slideLayout", "slideMaster")]
+    return deps
+
+@timed("cache_keys")
+def deck_cache_keys(package, media_store, limits=DEFAULT_LIMITS):
+    """Parse-cache keys for every master, layout, theme and slide part of a deck.
+
+    Keys follow the inheritance chain: a layout's key covers its master, and a
+    slide's key covers its layout and master, each with their rels and the
+    media they reference, plus where media is stored, since the cached
+    results record it, and the table cell limit, so a part cached under a
+    looser limit is parsed (and checked) again under a stricter one.
+    """
+    index = package.index
+    extra = (media_store.root_dir, limits.max_table_cells)
+    keys = {}
+    for part_name in template_parts(package, "ppt/theme"):
+        keys[part_name] = part_cache_key(package, "theme", part_name)
+    for part_name in template_parts(package, "ppt/slideMasters"):
+        keys[part_name] = part_cache_key(package, "master", part_name, _own_dependencies(index, part_name), extra)
+    layout_deps = {}
+    for part_name in template_parts(package, "ppt/slideLayouts"):
+        master_part = first_related(index, part_name, "slideMaster")
+        layout_deps[part_name] = _own_dependencies(index, part_name)
+        if master_part:
+            layout_deps[part_name] += _own_dependencies(index, master_part)
+        keys[part_name] = part_cache_key(package, "layout", part_name, layout_deps[part_name], extra)
+    for part_name, _, _ in index.slides:
+        layout_part = first_related(index, part_name, "slideLayout")
+        depends_on = _own_dependencies(index, part_name) + layout_deps.get(layout_part, [])
+        keys[part_name] = part_cache_key(package, "slide", part_name, depends_on, extra)
+    return keys
+
+def _cached_media_present(part_name, value):
+    """Reject cached parts whose stored media has since been removed from the media store."""
+    if not isinstance(value, dict):
+        return True
+    refs = [ref for ref in (value.get("background"), *value.get("elements", ())) if ref]
+    return all(os.path.exists(path) for ref in refs
+               for path in (ref.get("file"), ref.get("chart_file")) if path)
+
+def slide_record(index, part_name, layout, slide_data):
+    """The {"record": "slide"} record for parsed slide data, or its error record if slide_data is None."""
+    record = {"record": "slide", "index": index,
+              "layout": layout["id"] if layout else None,
+              "master": layout["master"] if layout else None}
+    if slide_data is None:
+        return {**record, "background": None, "elements": [],
+                "error": f"{posixpath.basename(part_name)} could not be parsed"}
+    return {**record, "background": slide_data["background"], "elements": slide_data["elements"]}
+
+def iter_pptx_records(root, package, media_store, slide_workers=None, deck_cache=None, limits=DEFAULT_LIMITS):
+    """Yield the output of the combined PPTX tree as records; media parts are read from `package`
+    and recorded in `media_store`.
+
+    The first record is {"record": "header", "slide_count", "template"}, where
+    the template lists every resolved master, layout and theme by id. Then
+    comes one {"record": "slide", "index", "layout", "master", "background",
+    "elements"} per slide in presentation order, each yielded as soon as that
+    slide is parsed. Slides follow slide -> layout -> master -> theme through
+    the rels and reference the inherited parts by id instead of repeating
+    them; use resolve_inherited to inline them again.
+
+    Pass slide_workers > 1 to parse the slides concurrently in a process pool.
+    With a DeckCache, cached masters, layouts, themes and slides (left out of
+    the tree by build_pptx_xml) are spliced in and only the rest is parsed.
+    Slides missing from the tree (see build_pptx_xml's include_slides) are
+    read from `package` one at a time with load_slide as they are reached. A
+    slide part that then turns out to be malformed is logged and still gets
+    its record, with no background or elements and an "error", so the
+    header's slide_count and the indices stay true.
+    """
+    index = package.index
+    template = {"layouts": [], "masters": [], "themes": [], "theme": {}}
+    tree_parts = {elem.get('part'): elem for elem in root.iterfind('*/*[@part]')}
+
+    def cached(part_name):
+        return deck_cache.get(part_name) if deck_cache is not None else None
+
+    def remember(part_name, value):
+        if deck_cache is not None:
+            deck_cache.put(part_name, value)
+
+    def parse_part(part_name, parse):
+        value = cached(part_name)
+        if value is None and part_name in tree_parts:
+            value = parse(tree_parts[part_name])
+            remember(part_name, value)
+        return value
+
+    # Slide order comes from presentation.xml's sldIdLst via the package index
+    if root.find('presentation') is not None:
+        slide_order = [posixpath.basename(part_name) for part_name, _, _ in index.slides]
+        logger.debug("Slide order from presentation.xml: %s", slide_order)
+    else:
+        logger.warning("No presentation element found in XML")
+
+    # Parse themes
+    themes = {}
+    for part_name in template_parts(package, "ppt/theme"):
+        theme_data = parse_part(part_name, parse_theme)
+        if theme_data is not None:
+            themes[part_id(part_name)] = theme_data
+            template["themes"].append({"id": part_id(part_name), **theme_data})
+
+    # Resolve each master once
+    masters = {}
+    for part_name in template_parts(package, "ppt/slideMasters"):
+        master = parse_part(part_name, lambda elem: resolve_master(elem, part_name, package, media_store))
+        if master is not None:
+            masters[part_name] = master
+            template["masters"].append(master)
+            logger.debug("Background elements parsed for %s: %d", master['id'], len(master['background_elements']))
+
+    # Resolve each layout once, on top of its own master
+    layouts = {}
+    for part_name in template_parts(package, "ppt/slideLayouts"):
+        master = masters.get(first_related(index, part_name, "slideMaster"))
+        layout = parse_part(part_name, lambda elem: resolve_layout(elem, part_name, master, package, media_store))
+        if layout is not None:
+            layouts[part_name] = layout
+            template["layouts"].append(layout)
+
+    # The deck's theme is the first master's, as before
+    first_master = template["masters"][0] if template["masters"] else None
+    if first_master is not None and first_master["theme"] in themes:
+        template["theme"] = themes[first_master["theme"]]
+    elif template["themes"]:
+        template["theme"] = themes[template["themes"][0]["id"]]
+
+    # Work out which slides come from the cache and which need parsing
+    slide_plan = []
+    slide_jobs = []
+    slide_files = package.list_parts("ppt/slides", ".xml")
+    if slide_files is not None:
+        for part_name, _, _ in index.slides:
+            slide_file = posixpath.basename(part_name)
+            layout = layouts.get(first_related(index, part_name, "slideLayout"))
+            slide_data = cached(part_name)
+            if slide_data is not None:
+                logger.debug("Using cached slide: %s", slide_file)
+                slide_plan.append((part_name, layout, slide_data))
+                continue
+            if part_name not in tree_parts and not package.has_part(part_name):
+                continue
+            rels = index.relationships(part_name)
+            if not rels:
+                logger.warning("No relationships found for %s.rels", slide_file)
+            slide_plan.append((part_name, layout, None))
+            slide_jobs.append((part_name, rels, layout))
+        for slide_file in slide_files:
+            if f"ppt/slides/{slide_file}" not in index.slide_numbers:
+                logger.warning("Slide %s not in expected order, skipping", slide_file)
+    else:
+        logger.warning("No slides found in package")
+
+    yield {"record": "header", "slide_count": len(slide_plan), "template": template}
+
+    # Parse slides, holding at most one slide tree at a time unless the caller built them all into `root`
+    if slide_workers and slide_workers > 1 and len(slide_jobs) > 1:
+        parsed = iter_slides_parallel(slide_jobs, package, media_store, slide_workers, limits)
+    else:
+        parsed = (parse_slide(tree_parts[part_name], rels, package, media_store, layout, limits)
+                  if part_name in tree_parts else load_slide(package, part_name, rels, media_store, layout, limits)
+                  for part_name, rels, layout in slide_jobs)
+    failed = 0
+    for slide_index, (part_name, layout, slide_data) in enumerate(slide_plan):
+        if slide_data is None:
+            logger.debug("Processing slide: %s", posixpath.basename(part_name))
+            slide_data = next(parsed)
+            if slide_data is None:
+                failed += 1
+            else:
+                remember(part_name, slide_data)
+        yield slide_record(slide_index, part_name, layout, slide_data)
+    logger.info("Total slides parsed: %d", len(slide_plan) - failed)
+
+def collect_records(records):
+    """Assemble header and slide records back into the {"slides", "template"} output dict.
+
+    Returns None if there are no records (the deck could not be opened).
+    """
+    header = next(records, None)
+    if header is None:
+        return None
+    slides = [{key: value for key, value in record.items() if key not in ("record", "index")}
+              for record in records]
+    return {"slides": slides, "template": header["template"]}
+
+def parse_pptx_xml(root, package, media_store, slide_workers=None, deck_cache=None):
+    """Turn the combined PPTX tree into the output dict; see iter_pptx_records."""
+    return collect_records(iter_pptx_records(root, package, media_store, slide_workers, deck_cache))
+
+def iter_records(pptx_file, xml_output_file=None, extract=False, slide_workers=None, media_store=None,
+                 cache=None, limits=DEFAULT_LIMITS):
+    """Convert a deck in-process, yielding a header record and then one record per slide.
+
+    See iter_pptx_records for the record layout; nothing is yielded if the
+    deck cannot be opened or is over `limits` (see limits.Limits); a table
+    found to be over limits.max_table_cells raises LimitExceeded. The
+    template tree from build_pptx_xml is handed straight to the JSON stage and
+    slides are then read, parsed and released one at a time, so memory peaks
+    with the largest slide rather than the whole deck.
+    Pass xml_output_file to also save the full combined tree (slides
+    included) as a debug artefact and slide_workers
+    to parse the slides of a large deck in parallel. Media goes to
+    `media_store`, by default a MediaStore in ./media; use MediaStore(None) to
+    only record archive members and hashes. With a ParseCache, parts whose
+    checksums (and dependencies) are unchanged since an earlier conversion are
+    taken from the cache instead of being loaded and parsed again.
+    """
+    if media_store is None:
+        media_store = MediaStore("media")
+    package = open_package(pptx_file, extract=extract, limits=limits)
+    if package is None:
+        logger.error("Failed to extract PPTX in ppt_to_xml, aborting.")
+        return None
+    deck_cache = None
+    try:
+        if cache is not None:
+            deck_cache = DeckCache(cache, deck_cache_keys(package, media_store, limits), validate=_cached_media_present)
+        root = build_pptx_xml(package, skip_parts=deck_cache.hits if deck_cache is not None else (),
+                              include_slides=xml_output_file is not None)
+        if xml_output_file is not None:
+            write_pptx_xml(root, xml_output_file)
+        yield from iter_pptx_records(root, package, media_store, slide_workers=slide_workers,
+                                     deck_cache=deck_cache, limits=limits)
+    finally:
+        package.close()
+        if deck_cache is not None:
+            # Parts parsed before a failure or an early stop are still valid entries
+            deck_cache.flush()
+
+def convert(pptx_file, xml_output_file=None, extract=False, slide_workers=None, media_store=None, cache=None,
+            limits=DEFAULT_LIMITS):
+    """Convert a deck to the output dict in-process, or return None on failure.
+
+    Takes the same options as iter_records.
+    """
+    return collect_records(iter_records(pptx_file, xml_output_file=xml_output_file, extract=extract,
+                                        slide_workers=slide_workers, media_store=media_store, cache=cache,
+                                        limits=limits))
+
+def write_ndjson(records, f):
+    """Write records as compact JSON lines, flushing each so readers can start on slide 1 right away.
+
+    Returns the number of records written.
+    """
+    count = 0
+    for record in records:
+        f.write(json.dumps(record, separators=(',', ':')))
+        f.write("\n")
+        f.flush()
+        count += 1
+    return count
+
+def convert_ndjson(pptx_file, output_file, **options):
+    """Stream a deck to an NDJSON file, one slide per line; returns False if the deck could not be opened.
+
+    Takes the same options as iter_records.
+    """
+    with open(output_file, 'w') as f:
+        written = write_ndjson(iter_records(pptx_file, **options), f)
+    if not written:
+        os.remove(output_file)
+    return written > 0
+
+def main(pptx_file, debug_xml=False, slide_workers=None, copy_media=True, cache_path=None, ndjson=False,
+         metrics_file=None, profile=None):
+    """Convert one deck into extracted_json/.
+
+    metrics_file writes the conversion's stage timings and counters as JSON
+    lines; profile ("cprofile" or "tracemalloc") attaches that profiler to the
+    conversion and saves its raw output next to the JSON.
+    """
     xml_output_dir = "/Users/aryan98/ppt_mvp/parser/extracted_xml"
     json_output_dir = "/Users/aryan98/ppt_mvp/parser/extracted_json"
 
     # Ensure directories exist
-    os.makedirs(xml_output_dir, exist_ok=True)
     os.makedirs(json_output_dir, exist_ok=True)
 
     # Extract the base name from pptx_file (e.g., "test diyea 3")
     base_name = os.path.splitext(os.path.basename(pptx_file))[0]
-    xml_file = os.path.join(xml_output_dir, f"{base_name}.xml")
-    output_file = os.path.join(json_output_dir, f"{base_name}.json")
+    output_file = os.path.join(json_output_dir, f"{base_name}.ndjson" if ndjson else f"{base_name}.json")
+    xml_file = None
+    if debug_xml:
+        os.makedirs(xml_output_dir, exist_ok=True)
+        xml_file = os.path.join(xml_output_dir, f"{base_name}.xml")
 
-    # Call pptx_to_xml and get the extraction directory
-    extract_dir = pptx_to_xml(pptx_file, output_xml_file=xml_file)
-    if extract_dir is None:
-        print("Failed to extract PPTX in ppt_to_xml, aborting.")
-        return
+    media_store = MediaStore(os.path.join(json_output_dir, "media") if copy_media else None)
+    cache = ParseCache(cache_path) if cache_path else None
+    recorder = Recorder(deck=pptx_file) if metrics_file or profile else None
+    with recording(recorder) if recorder else contextlib.nullcontext(), \
+            profiling(profile, os.path.join(json_output_dir, f"{base_name}.{profile}")) if profile \
+            else contextlib.nullcontext():
+        try:
+            with stage("convert"):
+                if ndjson:
+                    if convert_ndjson(pptx_file, output_file, xml_output_file=xml_file, slide_workers=slide_workers,
+                                      media_store=media_store, cache=cache):
+                        logger.info("Parsed data streamed to %s", output_file)
+                    output_data = None
+                else:
+                    output_data = convert(pptx_file, xml_output_file=xml_file, slide_workers=slide_workers,
+                                          media_store=media_store, cache=cache)
+        finally:
+            if cache is not None:
+                logger.info("Parse cache: %s", cache.stats())
+                cache.close()
 
-    # Load the generated XML
-    parser = etree.XMLParser(remove_blank_text=True)
-    try:
-        tree = etree.parse(xml_file, parser)
-    except Exception as e:
-        print(f"Error loading {xml_file}: {e}")
-        return
-    
-    root = tree.getroot()
-    output_data = {"slides": [], "template": {"layouts": [], "theme": {}}}
-    
-    # Get slide order from presentation.xml
-    pres_elem = root.find('.//presentation')
-    slide_order = []
-    if pres_elem is not None:
-        slide_ids = [(sld.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'), 
-                      sld.get('id')) 
-                     for sld in pres_elem.findall('.//p:sldIdLst/p:sldId', NS)]
-        slide_order = [f"slide{i+1}.xml" for i in range(len(slide_ids))]
-        print(f"Slide order from presentation.xml: {slide_order}")
-    else:
-        print("No presentation element found in XML")
-    
-    # Parse slide masters
-    master_elem = root.find('.//slideMasters/slideMaster')
-    background_elements = parse_master(master_elem) if master_elem is not None else []
-    print(f"Background elements parsed: {len(background_elements)}")
-
-    # Parse slides
-    slides_elem = root.find('.//slides')
-    if slides_elem is not None:
-        for i, slide_elem in enumerate(slides_elem.findall('.//slide')):
-            slide_file = slide_elem.get('file')
-            print(f"Processing slide: {slide_file}")
-            if slide_file in slide_order:
-                slide_idx = slide_order.index(slide_file)
-                rels_file = f"{slide_file}.rels"
-                rels_elem = root.find(f'.//relationships/relationship[@file="{rels_file}"]')
-                if rels_elem is None:
-                    print(f"Warning: No relationships found for {rels_file}, using None")
-                slide_data = parse_slide(slide_elem, rels_elem, extract_dir, slide_idx, background_elements)
-                output_data["slides"].append(slide_data)
-            else:
-                print(f"Slide {slide_file} not in expected order, skipping")
-        print(f"Total slides parsed: {len(output_data['slides'])}")
-    else:
-        print("No slides element found in XML")
-
-    # Parse layouts
-    layouts_elem = root.find('.//slideLayouts')
-    if layouts_elem is not None:
-        for layout_elem in layouts_elem.findall('.//slideLayout'):
-            layout_data = parse_layout(layout_elem)
-            output_data["template"]["layouts"].append(layout_data)
-    
-    # Parse theme
-    theme_elem = root.find('.//themes/theme')
-    if theme_elem is not None:
-        output_data["template"]["theme"] = parse_theme(theme_elem)
-    
-    # Save JSON
-    with open(output_file, 'w') as f:
-        json.dump(output_data, f, indent=2)
-        print(f"Parsed data saved to {output_file}")
+        if output_data is not None:
+            # Save JSON
+            with stage("write_json"), open(output_file, 'w') as f:
+                json.dump(output_data, f, indent=2)
+            increment("bytes_written", os.path.getsize(output_file))
+            logger.info("Parsed data saved to %s", output_file)
+
+    if metrics_file:
+        with open(metrics_file, 'w') as f:
+            recorder.write_jsonl(f)
+        logger.info("Metrics saved to %s", metrics_file)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     pptx_file = "/Users/aryan98/ppt_mvp/ppt_samples/test diyea 3.pptx"
-    main(pptx_file)
\ No newline at end of file
+    main(pptx_file)